@@ -0,0 +1,81 @@
+"""Environment configuration for the handlers, read once per process."""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Config:
+    """Snapshot of the environment variables the handlers use."""
+
+    # Production McLeod
+    mcleod_base_url: Optional[str]
+    mcleod_auth_token: Optional[str]
+    mcleod_auth_type: str
+    mcleod_company_id: Optional[str]
+
+    # TRN (staging) McLeod
+    trn_mcleod_base_url: Optional[str]
+    trn_mcleod_auth_token: Optional[str]
+    trn_mcleod_auth_type: str
+
+    # Workflow webhooks
+    pre_pickup_webhook_url: Optional[str]
+    pre_shipment_webhook_url: Optional[str]
+    trn_pre_shipment_webhook_url: Optional[str]
+    in_transit_webhook_url: Optional[str]
+    trn_in_transit_webhook_url: Optional[str]
+
+    # How far past its scheduled time a pre-shipment call may still be sent
+    late_2h_call_grace_seconds: int
+    late_30m_call_grace_seconds: int
+
+    # Deduplication
+    redis_url: Optional[str]
+
+    # Load Event (broker) API, fed by find_load
+    broker_url: Optional[str]
+    broker_key: Optional[str]
+    org_id: Optional[str]
+    load_event_timeout: int
+    proxy_parallel: bool
+
+    @classmethod
+    def load(cls) -> "Config":
+        """Read the configuration from the environment."""
+        return cls(
+            mcleod_base_url=os.getenv("MCLEOD_BASE_URL"),
+            mcleod_auth_token=os.getenv("MCLEOD_AUTH_TOKEN"),
+            mcleod_auth_type=os.getenv("MCLEOD_AUTH_TYPE", "Bearer"),
+            mcleod_company_id=os.getenv("MCLEOD_COMPANY_ID"),
+            trn_mcleod_base_url=os.getenv("TRN_MCLEOD_BASE_URL"),
+            trn_mcleod_auth_token=os.getenv("TRN_MCLEOD_AUTH_TOKEN"),
+            trn_mcleod_auth_type=os.getenv("TRN_MCLEOD_AUTH_TYPE", "Bearer"),
+            pre_pickup_webhook_url=os.getenv("PRE_PICKUP_WEBHOOK_URL"),
+            pre_shipment_webhook_url=os.getenv("PRE_SHIPMENT_WEBHOOK_URL"),
+            trn_pre_shipment_webhook_url=os.getenv("TRN_PRE_SHIPMENT_WEBHOOK_URL"),
+            in_transit_webhook_url=os.getenv("IN_TRANSIT_WEBHOOK_URL"),
+            trn_in_transit_webhook_url=os.getenv("TRN_IN_TRANSIT_WEBHOOK_URL"),
+            late_2h_call_grace_seconds=int(os.getenv("LATE_2H_CALL_GRACE_SECONDS", "1800")),
+            late_30m_call_grace_seconds=int(os.getenv("LATE_30M_CALL_GRACE_SECONDS", "600")),
+            redis_url=os.getenv("REDIS_URL"),
+            broker_url=os.getenv("BROKER_URL"),
+            broker_key=os.getenv("BROKER_KEY"),
+            org_id=os.getenv("ORG_ID"),
+            load_event_timeout=int(os.getenv("LOAD_EVENT_TIMEOUT", "30")),
+            proxy_parallel=os.getenv("PROXY_PARALLEL") == "1",
+        )
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Process-wide Config, loaded from the environment on first use."""
+    return Config.load()
+
+
+def reload_config() -> Config:
+    """Re-read the environment (e.g. after changing it in tests)."""
+    get_config.cache_clear()
+    return get_config()
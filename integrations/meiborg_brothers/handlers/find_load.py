@@ -1,201 +1,273 @@
 """Lambda handler for Meiborg Brothers Find Load integration."""
 
-import os
-import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, Optional, List, Tuple
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from handlers.config import Config, get_config
 from handlers.models import FindLoadRequest, FindLoadResponse
 from handlers.find_load_utils import map_find_load_payload
 
 
-def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+# Shared HTTP session, created once per process so warm invocations reuse
+# pooled keep-alive connections to McLeod and the Load Event API.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=0))
+SESSION.headers.update({"Accept": "application/json"})
+
+
+@lru_cache(maxsize=1)
+def _mcleod_request(config: Config) -> Tuple[str, Dict[str, str]]:
+    """McLeod search URL and per-request headers, built once per Config."""
+    base_url = (config.mcleod_base_url or "").rstrip("/")
+    auth_type = config.mcleod_auth_type.strip()
+    # Format: "Bearer <token>" or "Basic <token>" or just the token if type is empty
+    if auth_type and auth_type.lower() != "none":
+        auth_header = f"{auth_type} {config.mcleod_auth_token}"
+    else:
+        auth_header = config.mcleod_auth_token
+    # Accept is set on the shared session
+    headers: Dict[str, str] = {"Authorization": auth_header}
+    if config.mcleod_company_id:
+        headers["X-com.mcleodsoftware.CompanyID"] = config.mcleod_company_id
+    return f"{base_url}/ws/orders/search", headers
+
+
+@lru_cache(maxsize=1)
+def _broker_headers(config: Config) -> Dict[str, str]:
+    """Load Event API request headers, built once per Config."""
+    return {
+        "Content-Type": "application/json",
+        "X-API-Key": config.broker_key,
+    }
+
+
+# With Config.proxy_parallel (PROXY_PARALLEL=1), multi-order results are
+# posted one order per request, concurrently
+_PROXY_MAX_WORKERS = 8  # stays below the session's pool_maxsize
+
+# FindLoadRequest field -> McLeod /ws/orders/search query parameter
+_QUERY_FIELD_MAP = (
+    ("order_id", "id"),
+    ("status", "orders.status"),
+    ("shipper_location_id", "shipper.location_id"),
+    ("consignee_state", "consignee.state"),
+    ("customer_id", "customer.id"),
+    ("record_length", "recordLength"),
+    ("record_offset", "recordOffset"),
+    ("order_by", "orderBy"),
+    ("changed_after_date", "changedAfterDate"),
+    ("changed_after_type", "changedAfterType"),
+)
+
+# McLeod stop_type / reference qualifier classification
+_PU_TYPES = frozenset({"PU", "ORIGIN"})
+_SO_TYPES = frozenset({"SO", "DESTINATION"})
+_PICK_TYPES = frozenset({"PICK", "P"})
+_DROP_TYPES = frozenset({"DROP", "D"})
+_PICKUP_QUALS = frozenset({"OQ", "ORDER NUMBER"})
+_PO_QUALS = frozenset({"PO", "PURCHASE ORDER NUMBER"})
+
+# Contact phone normalization: drop dashes and spaces
+_PHONE_STRIP = str.maketrans("", "", "- ")
+
+# Broker status normalization used by _derive_status
+_ALLOWED_STATUSES = frozenset({
+    "at_pickup",
+    "picked_up",
+    "at_delivery",
+    "dispatched",
+    "delivered",
+    "en_route",
+    "in_transit",
+    "completed",
+    "available",
+    "covered",
+    "unavailable",
+})
+_AVAIL_CODES = frozenset({"A", "ACTIVE", "REVIEW"})
+_AVAIL_DESCRS = _AVAIL_CODES | {"AVAILABLE"}
+_STATUS_DIRECT_MAP: Dict[str, str] = {
+    **{status: status for status in _ALLOWED_STATUSES},
+    "delv": "delivered",
+    "disp": "dispatched",
+    "avail": "available",
+    "at pu": "at_pickup", "atpu": "at_pickup", "pu": "at_pickup",
+    "picked up": "picked_up", "pku": "picked_up",
+    "at dl": "at_delivery", "atdl": "at_delivery", "dl": "at_delivery",
+    "en route": "en_route", "enroute": "en_route", "en_rt": "en_route",
+    "in transit": "in_transit", "intr": "in_transit",
+    "cmpl": "completed",
+    "covr": "covered",
+    "unav": "unavailable",
+}
+_STATUS_PREFIX_RE = re.compile(r"^(deliver|dispatch|avail|complet|cover|unavail)")
+_STATUS_PREFIX_MAP = {
+    "deliver": "delivered",
+    "dispatch": "dispatched",
+    "avail": "available",
+    "complet": "completed",
+    "cover": "covered",
+    "unavail": "unavailable",
+}
+
+# McLeod timestamp prefix: YYYYMMDDHHMMSS (timezone suffix ignored)
+_MCLEOD_TS_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})")
+
+
+def find_load_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
-    AWS Lambda handler for finding loads via McLeod API.
+    Find loads via McLeod API and proxy them to the Load Event API.
     
     Args:
-        event: Lambda event containing request data
+        event: Lambda-style event containing request data
         context: Lambda context object
         
     Returns:
-        Dictionary with statusCode and body
+        Dictionary with statusCode and body (a dict, not yet serialized)
     """
     try:
-        # Parse request body
+        # Parse and validate request
         if isinstance(event.get("body"), str):
-            body = json.loads(event["body"])
+            request = FindLoadRequest.model_validate_json(event["body"])
         else:
-            body = event.get("body", {})
-        
-        # Validate request
-        request = FindLoadRequest(**body)
+            request = FindLoadRequest.model_validate(event.get("body", {}))
         
-        # Get McLeod API configuration from environment
-        mcleod_base_url = os.environ.get("MCLEOD_BASE_URL")
-        mcleod_auth_token = os.environ.get("MCLEOD_AUTH_TOKEN")
-        mcleod_auth_type = os.environ.get("MCLEOD_AUTH_TYPE", "Bearer").strip()  # Default to Bearer
-        mcleod_company_id = os.environ.get("MCLEOD_COMPANY_ID")
-        
-        if not mcleod_base_url:
+        config = get_config()
+        if not config.mcleod_base_url:
             return {
                 "statusCode": 500,
-                "body": json.dumps({
+                "body": {
                     "message": "Missing required MCLEOD_BASE_URL configuration",
                     "status_code": 500
-                })
+                }
             }
         
-        if not mcleod_auth_token:
+        if not config.mcleod_auth_token:
             return {
                 "statusCode": 500,
-                "body": json.dumps({
+                "body": {
                     "message": "Missing required MCLEOD_AUTH_TOKEN configuration",
                     "status_code": 500
-                })
+                }
             }
         
         # Build query parameters
-        query_params = {}
-        
-        # Add order ID filter (exact match)
-        if request.order_id:
-            query_params["id"] = request.order_id
-        
-        # Add status filter
-        if request.status:
-            query_params["orders.status"] = request.status
-        
-        # Add shipper location filter
-        if request.shipper_location_id:
-            query_params["shipper.location_id"] = request.shipper_location_id
-        
-        # Add consignee state filter
-        if request.consignee_state:
-            query_params["consignee.state"] = request.consignee_state
-        
-        # Add customer filter
-        if request.customer_id:
-            query_params["customer.id"] = request.customer_id
-        
-        # Add pagination
-        if request.record_length:
-            query_params["recordLength"] = request.record_length
-        if request.record_offset:
-            query_params["recordOffset"] = request.record_offset
-        
-        # Add sorting
-        if request.order_by:
-            query_params["orderBy"] = request.order_by
-        
-        # Add change tracking
-        if request.changed_after_date:
-            query_params["changedAfterDate"] = request.changed_after_date
-        if request.changed_after_type:
-            query_params["changedAfterType"] = request.changed_after_type
+        query_params = {
+            api_key: value
+            for attr, api_key in _QUERY_FIELD_MAP
+            if (value := getattr(request, attr))
+        }
         
         # Add any additional parameters
         if request.additional_params:
             query_params.update(request.additional_params)
         
-        # Prepare headers
-        headers = {
-            "Accept": "application/json",
-        }
-
-        # Add authorization (required)
-        # Format: "Bearer <token>" or "Basic <token>" or just the token if type is empty
-        if mcleod_auth_type and mcleod_auth_type.lower() != "none":
-            headers["Authorization"] = f"{mcleod_auth_type} {mcleod_auth_token}"
-        else:
-            headers["Authorization"] = mcleod_auth_token
-
-        # Add company ID header if configured
-        if mcleod_company_id:
-            headers["X-com.mcleodsoftware.CompanyID"] = mcleod_company_id
-
         # Make request to McLeod API
-        url = f"{mcleod_base_url.rstrip('/')}/ws/orders/search"
-        response = requests.get(url, params=query_params, headers=headers, timeout=30)
+        mcleod_url, mcleod_headers = _mcleod_request(config)
+        response = SESSION.get(mcleod_url, params=query_params, headers=mcleod_headers, timeout=30)
         
         # Handle response
         if response.status_code == 200:
             try:
-                data = response.json()
+                data = orjson.loads(response.content)
 
                 # Build and forward Load Event payload (proxy)
                 proxy_result = _proxy_load_event(data)
 
                 return {
                     "statusCode": 200,
-                    "body": json.dumps({
+                    "body": {
                         "status_code": 200,
                         "data": data,
                         "proxy": proxy_result,
                         "message": "Successfully retrieved loads and proxied load event"
-                    })
+                    }
                 }
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 # If JSON parsing fails, return raw response
                 return {
                     "statusCode": 200,
-                    "body": json.dumps({
+                    "body": {
                         "status_code": 200,
                         "data": response.text,
                         "message": "Successfully retrieved loads (raw response)"
-                    })
+                    }
                 }
         else:
             return {
                 "statusCode": response.status_code,
-                "body": json.dumps({
+                "body": {
                     "status_code": response.status_code,
                     "message": f"McLeod API error: {response.text}",
                     "data": None
-                })
+                }
             }
     
     except ValueError as e:
         # Pydantic validation error
         return {
             "statusCode": 400,
-            "body": json.dumps({
+            "body": {
                 "status_code": 400,
                 "message": f"Invalid request: {str(e)}",
                 "data": None
-            })
+            }
         }
     except requests.exceptions.RequestException as e:
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": {
                 "status_code": 500,
                 "message": f"Request to McLeod API failed: {str(e)}",
                 "data": None
-            })
+            }
         }
     except Exception as e:
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": {
                 "status_code": 500,
                 "message": f"Internal server error: {str(e)}",
                 "data": None
-            })
+            }
         }
 
 
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    AWS Lambda handler for finding loads via McLeod API.
+    
+    Same as find_load_handler, with the body serialized to a JSON string as
+    Lambda proxy responses require.
+    
+    Args:
+        event: Lambda event containing request data
+        context: Lambda context object
+        
+    Returns:
+        Dictionary with statusCode and body
+    """
+    result = find_load_handler(event, context)
+    result["body"] = orjson.dumps(result["body"]).decode()
+    return result
+
+
 def _proxy_load_event(mcleod_data: Any) -> Dict[str, Any]:
     """Transform McLeod order(s) into Load Event payload and POST to Load Event API.
 
-    Returns a dict with status and response for observability.
+    Returns a dict with status and response for observability. With
+    PROXY_PARALLEL=1 and several orders, each order is POSTed on its own:
+    "status" is then the worst status (the first non-2xx, else the first),
+    "response" the first delivered body, and "results" holds one
+    {"status", "response"} or {"error"} entry per order.
     """
     try:
-        # Read Load Event configuration
-        broker_url = os.environ.get("BROKER_URL")
-        broker_key = os.environ.get("BROKER_KEY")
-        org_id = os.environ.get("ORG_ID")
-        load_event_timeout = int(os.environ.get("LOAD_EVENT_TIMEOUT", "30"))
-
-        if not broker_url or not broker_key:
+        config = get_config()
+        if not config.broker_url or not config.broker_key:
             return {
                 "enabled": False,
                 "reason": "Missing BROKER_URL or BROKER_KEY",
@@ -207,10 +279,20 @@ def _proxy_load_event(mcleod_data: Any) -> Dict[str, Any]:
             orders = mcleod_data
         elif isinstance(mcleod_data, dict) and mcleod_data.get("__type") == "orders":
             orders = [mcleod_data]
+        elif isinstance(mcleod_data, dict) and (
+            mcleod_data.get("totalCount") == 0
+            or ("orders" in mcleod_data and not mcleod_data["orders"])
+        ):
+            # Empty search result envelope
+            orders = []
         else:
             # Unknown structure; forward raw as single payload
             orders = [mcleod_data] if mcleod_data else []
 
+        # Nothing came back from the search; skip the transform and the POST
+        if not orders:
+            return {"enabled": True, "sent": False, "reason": "No orders to proxy"}
+
         # Transform orders to Load Event payload(s)
         transformed_payload = _transform_orders_to_load_event(orders)
 
@@ -224,33 +306,40 @@ def _proxy_load_event(mcleod_data: Any) -> Dict[str, Any]:
             payload_to_send = transformed_payload
 
         # Attach org_id if provided
-        if org_id:
+        if config.org_id:
             if isinstance(payload_to_send, list):
                 for p in payload_to_send:
-                    p.setdefault("org_id", org_id)
+                    p.setdefault("org_id", config.org_id)
             else:
-                payload_to_send.setdefault("org_id", org_id)
+                payload_to_send.setdefault("org_id", config.org_id)
+
+        # Fan out one POST per order when enabled
+        if config.proxy_parallel and isinstance(payload_to_send, list):
+            workers = min(_PROXY_MAX_WORKERS, len(payload_to_send))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_post_load_event_entry, payload_to_send))
+            delivered = [r for r in results if "error" not in r]
+            statuses = [r["status"] for r in delivered]
+            return {
+                "enabled": True,
+                "sent": bool(delivered),
+                "status": next((st for st in statuses if not 200 <= st < 300), statuses[0] if statuses else None),
+                "response": delivered[0]["response"] if delivered else None,
+                "results": results,
+                "url": config.broker_url,
+                "count": len(results),
+                "failed": len(results) - len(delivered),
+            }
 
         # Send to Load Event API
-        url = broker_url
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "X-API-Key": broker_key,
-        }
-        resp = requests.post(url, headers=headers, json=payload_to_send, timeout=load_event_timeout)
-        result_body: Any
-        try:
-            result_body = resp.json()
-        except Exception:
-            result_body = resp.text
+        status, result_body = _post_load_event(payload_to_send)
 
         return {
             "enabled": True,
             "sent": True,
-            "status": resp.status_code,
+            "status": status,
             "response": result_body,
-            "url": url,
+            "url": config.broker_url,
             "count": len(transformed_payload) if isinstance(payload_to_send, list) else 1,
         }
     except Exception as e:
@@ -261,21 +350,57 @@ def _proxy_load_event(mcleod_data: Any) -> Dict[str, Any]:
         }
 
 
+def _post_load_event(payload: Any) -> Tuple[int, Any]:
+    """POST a Load Event payload; returns (status_code, parsed or raw body)."""
+    config = get_config()
+    resp = SESSION.post(
+        config.broker_url,
+        headers=_broker_headers(config),
+        data=orjson.dumps(payload),
+        timeout=config.load_event_timeout,
+    )
+    result_body: Any
+    try:
+        result_body = orjson.loads(resp.content)
+    except Exception:
+        result_body = resp.text
+    return resp.status_code, result_body
+
+
+def _post_load_event_entry(payload: Any) -> Dict[str, Any]:
+    """_post_load_event for one order of a parallel fan-out; errors are reported, not raised."""
+    try:
+        status, result_body = _post_load_event(payload)
+    except Exception as e:
+        return {"error": str(e)}
+    return {"status": status, "response": result_body}
+
+
 def _transform_orders_to_load_event(orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Extract essential fields from McLeod orders into Load Event payloads."""
     payloads: List[Dict[str, Any]] = []
     for order in orders:
         try:
+            # Resolve the shared sub-objects once per order
+            mvt0 = _first_movement(order)
+            raw_stops = order.get("stops") or []
+
             custom_load_id = _get_order_id(order)
-            status = _derive_status(order)
-            equipment_type = _extract_equipment(order)
-            miles = _extract_miles(order)
-            max_buy = _extract_max_buy(order)
-            posted_carrier_rate = _extract_posted_carrier_rate(order)
-            weight = _extract_weight(order)
-            origin, destination = _extract_origin_destination(order)
-            stops = _extract_stops(order)
-            pickup_number, po_number = _extract_reference_numbers(order)
+            status = _derive_status(order, mvt0)
+            scan = _scan_stops(raw_stops)
+            equipment_type = scan["equipment"]
+            if equipment_type is None:
+                # Fallback: order.__equipmentTypeDescr
+                et = order.get("__equipmentTypeDescr")
+                equipment_type = str(et).strip() if et else None
+            miles = _extract_miles(order, mvt0)
+            max_buy = _extract_max_buy(mvt0)
+            posted_carrier_rate = _extract_posted_carrier_rate(mvt0)
+            weight = scan["weight"]
+            origin, destination = _extract_origin_destination(raw_stops)
+            stops = scan["stops_out"]
+            pickup_number = scan["pickup_number"]
+            po_number = scan["po_number"]
             pickup_open, pickup_close, delivery_open, delivery_close = _extract_overall_windows(origin, destination, stops)
             contacts = _extract_contacts(order)
             commodity_type = order.get("commodity")
@@ -286,8 +411,8 @@ def _transform_orders_to_load_event(orders: List[Dict[str, Any]]) -> List[Dict[s
             bol_number = order.get("blnum")
             branch = order.get("revenue_code_id")
             customer_id = order.get("customer_id")
-            truck_number, trailer_number = _extract_power_units(order)
-            sale_notes = _extract_sale_notes(order)
+            truck_number, trailer_number = _extract_power_units(mvt0)
+            sale_notes = scan["sale_notes"]
 
             payload: Dict[str, Any] = {
                 "event_type": "load_upsert",
@@ -295,60 +420,37 @@ def _transform_orders_to_load_event(orders: List[Dict[str, Any]]) -> List[Dict[s
                 "status": status,
                 "type": "owned",
             }
-
-            if equipment_type:
-                payload["equipment_type_name"] = equipment_type
-            if miles is not None:
-                payload["miles"] = miles
-            if max_buy is not None:
-                payload["max_buy"] = max_buy
-            if posted_carrier_rate is not None:
-                payload["posted_carrier_rate"] = posted_carrier_rate
-            if weight is not None:
-                payload["weight"] = weight
-            if commodity_type:
-                payload["commodity_type"] = commodity_type
-            if number_of_pieces is not None:
-                payload["number_of_pieces"] = number_of_pieces
-            if is_partial is not None:
-                payload["is_partial"] = is_partial
-            if is_hazmat is not None:
-                payload["is_hazmat"] = is_hazmat
-                payload["is_hazardous"] = is_hazmat
-            if is_team_required is not None:
-                payload["is_team_required"] = is_team_required
-            if bol_number:
-                payload["bol_number"] = bol_number
-            if truck_number:
-                payload["truck_number"] = truck_number
-            if trailer_number:
-                payload["trailer_number"] = trailer_number
-            if branch:
-                payload["branch"] = branch
-            if customer_id:
-                payload["customer_id"] = customer_id
-            if origin:
-                payload["origin"] = origin
-            if destination:
-                payload["destination"] = destination
-            if stops:
-                payload["stops"] = stops
-            if pickup_number:
-                payload["pickup_number"] = pickup_number
-            if po_number:
-                payload["po_number"] = po_number
-            if pickup_open:
-                payload["pickup_date_open"] = pickup_open
-            if pickup_close:
-                payload["pickup_date_close"] = pickup_close
-            if delivery_open:
-                payload["delivery_date_open"] = delivery_open
-            if delivery_close:
-                payload["delivery_date_close"] = delivery_close
-            if contacts:
-                payload["contacts"] = contacts
-            if sale_notes:
-                payload["sale_notes"] = sale_notes
+            # Optional fields: falsy text/collections are normalized to None and dropped;
+            # numeric and boolean fields are dropped only when missing.
+            payload.update((key, value) for key, value in (
+                ("equipment_type_name", equipment_type or None),
+                ("miles", miles),
+                ("max_buy", max_buy),
+                ("posted_carrier_rate", posted_carrier_rate),
+                ("weight", weight),
+                ("commodity_type", commodity_type or None),
+                ("number_of_pieces", number_of_pieces),
+                ("is_partial", is_partial),
+                ("is_hazmat", is_hazmat),
+                ("is_hazardous", is_hazmat),
+                ("is_team_required", is_team_required),
+                ("bol_number", bol_number or None),
+                ("truck_number", truck_number or None),
+                ("trailer_number", trailer_number or None),
+                ("branch", branch or None),
+                ("customer_id", customer_id or None),
+                ("origin", origin or None),
+                ("destination", destination or None),
+                ("stops", stops or None),
+                ("pickup_number", pickup_number or None),
+                ("po_number", po_number or None),
+                ("pickup_date_open", pickup_open or None),
+                ("pickup_date_close", pickup_close or None),
+                ("delivery_date_open", delivery_open or None),
+                ("delivery_date_close", delivery_close or None),
+                ("contacts", contacts or None),
+                ("sale_notes", sale_notes or None),
+            ) if value is not None)
 
             payloads.append(payload)
         except Exception:
@@ -368,101 +470,63 @@ def _get_order_id(order: Dict[str, Any]) -> str:
     return ""
 
 
-def _derive_status(order: Dict[str, Any]) -> str:
+def _normalize_status(t: str) -> Optional[str]:
+    """Map a stripped, lower-cased McLeod status code/description to an allowed broker status."""
+    if not t:
+        return None
+    # Direct matches and common descriptors → allowed
+    mapped = _STATUS_DIRECT_MAP.get(t)
+    if mapped:
+        return mapped
+    # Prefix families (Delivered, Dispatched, Covered, ...)
+    m = _STATUS_PREFIX_RE.match(t)
+    return _STATUS_PREFIX_MAP[m.group(1)] if m else None
+
+
+def _first_movement(order: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the order's first movement record, or {} when absent."""
+    mvts = order.get("movement") or []
+    if mvts and isinstance(mvts, list):
+        return mvts[0] or {}
+    return {}
+
+
+def _derive_status(order: Dict[str, Any], mvt0: Dict[str, Any]) -> str:
     """Map McLeod status fields into the allowed broker status values.
 
     Allowed values: at_pickup, picked_up, at_delivery, dispatched, delivered,
     en_route, in_transit, completed, available, covered, unavailable
     """
-    allowed = {
-        "at_pickup",
-        "picked_up",
-        "at_delivery",
-        "dispatched",
-        "delivered",
-        "en_route",
-        "in_transit",
-        "completed",
-        "available",
-        "covered",
-        "unavailable",
-    }
-
-    def normalize(text: str) -> Optional[str]:
-        if not text:
-            return None
-        t = text.strip().lower()
-        # Direct matches
-        if t in allowed:
-            return t
-        # Common descriptors → allowed
-        if t.startswith("deliver") or t == "delv":
-            return "delivered"
-        if t.startswith("dispatch") or t == "disp":
-            return "dispatched"
-        if t.startswith("avail") or t == "avail":
-            return "available"
-        if t in ("at pu", "at_pickup", "atpu", "pu"):
-            return "at_pickup"
-        if t in ("picked up", "picked_up", "pku"):
-            return "picked_up"
-        if t in ("at dl", "at_delivery", "atdl", "dl"):
-            return "at_delivery"
-        if t in ("en route", "enroute", "en_rt"):
-            return "en_route"
-        if t in ("in transit", "in_transit", "intr"):
-            return "in_transit"
-        if t.startswith("complet") or t == "cmpl":
-            return "completed"
-        if t.startswith("cover") or t == "covr":
-            return "covered"
-        if t.startswith("unavail") or t == "unav":
-            return "unavailable"
-        return None
-
     # 1) Try movement.brokerage_status (often coded like DELV/AVAIL/DISP)
-    mvts = order.get("movement") or []
-    if mvts and isinstance(mvts, list):
-        brokerage_status = (mvts[0] or {}).get("brokerage_status")
-        mapped = normalize(brokerage_status) if isinstance(brokerage_status, str) else None
+    brokerage_status = mvt0.get("brokerage_status")
+    if isinstance(brokerage_status, str):
+        mapped = _normalize_status(brokerage_status.strip().lower())
         if mapped:
             return mapped
 
-    # 2) Try orders.__statusDescr (text like Delivered/Available/In Transit)
+    # Strip the order-level status fields once; reused by the steps below
     status_descr = order.get("__statusDescr")
-    mapped = normalize(status_descr) if isinstance(status_descr, str) else None
+    status_descr = status_descr.strip() if isinstance(status_descr, str) else ""
+    status_code = order.get("status")
+    status_code = status_code.strip().upper() if isinstance(status_code, str) else ""
+
+    # 2) Try orders.__statusDescr (text like Delivered/Available/In Transit)
+    mapped = _normalize_status(status_descr.lower())
     if mapped:
         return mapped
 
     # 3) Try orders.status code fallback (e.g., 'D' → delivered)
-    code = order.get("status")
-    if isinstance(code, str):
-        code = code.strip().upper()
-        if code == "D":
-            return "delivered"
+    if status_code == "D":
+        return "delivered"
 
     # Default mapping requested:
     # McLeod A, ACTIVE, REVIEW → available; any other McLeod status → covered
-    status_code = (order.get("status") or "").strip().upper()
-    status_descr = (order.get("__statusDescr") or "").strip().upper()
-    if status_code in {"A", "ACTIVE", "REVIEW"} or status_descr in {"A", "ACTIVE", "REVIEW", "AVAILABLE"}:
+    if status_code in _AVAIL_CODES or status_descr.upper() in _AVAIL_DESCRS:
         return "available"
     return "covered"
 
 
-def _extract_equipment(order: Dict[str, Any]) -> Optional[str]:
-    # Look in stops.referenceNumbers for Equipment Initial description, else fallback
-    stops = order.get("stops") or []
-    for st in stops:
-        for ref in st.get("referenceNumbers", []) or []:
-            if (ref.get("__referenceQualDescr") == "Equipment Initial") and ref.get("reference_number"):
-                return str(ref["reference_number"]).strip()
-    # Fallback: order.__equipmentTypeDescr
-    et = order.get("__equipmentTypeDescr")
-    return str(et).strip() if et else None
-
-
-def _extract_miles(order: Dict[str, Any]) -> Optional[int]:
+def _extract_miles(order: Dict[str, Any], mvt0: Dict[str, Any]) -> Optional[int]:
     # Prefer billed miles from order if present, else movement move_distance
     bill = order.get("bill_distance")
     try:
@@ -470,80 +534,62 @@ def _extract_miles(order: Dict[str, Any]) -> Optional[int]:
             return int(float(bill))
     except Exception:
         pass
-    mvts = order.get("movement") or []
-    if mvts and isinstance(mvts, list):
-        miles = (mvts[0] or {}).get("move_distance")
-        try:
-            return int(miles) if miles is not None else None
-        except Exception:
-            return None
-    return None
+    miles = mvt0.get("move_distance")
+    try:
+        return int(miles) if miles is not None else None
+    except Exception:
+        return None
 
 
-def _extract_max_buy(order: Dict[str, Any]) -> Optional[float]:
-    mvts = order.get("movement") or []
-    if mvts and isinstance(mvts, list):
-        # Prefer numeric field if present
-        for key in ("max_buy", "max_buy_n"):
-            if key in (mvts[0] or {}):
-                try:
-                    return float((mvts[0] or {})[key])
-                except Exception:
-                    continue
+def _extract_max_buy(mvt0: Dict[str, Any]) -> Optional[float]:
+    # Prefer numeric field if present
+    for key in ("max_buy", "max_buy_n"):
+        if key in mvt0:
+            try:
+                return float(mvt0[key])
+            except Exception:
+                continue
     return None
 
 
-def _extract_posted_carrier_rate(order: Dict[str, Any]) -> Optional[float]:
+def _extract_posted_carrier_rate(mvt0: Dict[str, Any]) -> Optional[float]:
     """Heuristic for posted carrier rate: prefer override_max_pay, else target_pay."""
-    mvts = order.get("movement") or []
-    if mvts and isinstance(mvts, list):
-        for key in ("override_max_pay", "target_pay", "target_pay_n"):
-            val = (mvts[0] or {}).get(key)
-            if val is not None:
-                try:
-                    return float(val)
-                except Exception:
-                    continue
-    return None
-
-
-def _extract_weight(order: Dict[str, Any]) -> Optional[float]:
-    # Use weight from first stop if present
-    stops = order.get("stops") or []
-    for st in stops:
-        if "weight" in st and st["weight"] is not None:
+    for key in ("override_max_pay", "target_pay", "target_pay_n"):
+        val = mvt0.get(key)
+        if val is not None:
             try:
-                return float(st["weight"])
+                return float(val)
             except Exception:
                 continue
     return None
 
 
-def _extract_origin_destination(order: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
-    stops = order.get("stops") or []
+def _to_loc(st: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a McLeod stop to a Load Event location."""
+    return {
+        "city": st.get("city_name") or st.get("city"),
+        "state": st.get("state"),
+        "zip": st.get("zip_code") or st.get("zip"),
+        "country": "US",
+        "address": st.get("address"),
+    }
+
+
+def _extract_origin_destination(stops: List[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
     if not isinstance(stops, list) or not stops:
         return None, None
 
-    def to_loc(st: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            "city": st.get("city_name") or st.get("city"),
-            "state": st.get("state"),
-            "zip": st.get("zip_code") or st.get("zip"),
-            "country": "US",
-            "address": st.get("address"),
-        }
-
     origin_stop = None
     dest_stop = None
     for st in stops:
         st_type = (st.get("stop_type") or "").upper()
-        if not origin_stop and st_type in ("PU", "ORIGIN"):
+        if not origin_stop and st_type in _PU_TYPES:
             origin_stop = st
-        if st_type in ("SO", "DESTINATION"):
+        if st_type in _SO_TYPES:
             dest_stop = st
 
-    origin = to_loc(origin_stop) if origin_stop else None
-    destination = to_loc(dest_stop) if dest_stop else None
+    origin = _to_loc(origin_stop) if origin_stop else None
+    destination = _to_loc(dest_stop) if dest_stop else None
     return origin, destination
 
 
@@ -552,54 +598,88 @@ def _format_window(st: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
     def convert(val: Optional[str]) -> Optional[str]:
         if not val or not isinstance(val, str):
             return None
-        # Trim timezone suffix if present
-        core = val.split("-")[0]
-        if len(core) < 14:
-            return None
-        try:
-            return f"{core[0:4]}-{core[4:6]}-{core[6:8]}T{core[8:10]}:{core[10:12]}:{core[12:14]}"
-        except Exception:
-            return None
+        m = _MCLEOD_TS_RE.match(val)
+        return f"{m[1]}-{m[2]}-{m[3]}T{m[4]}:{m[5]}:{m[6]}" if m else None
 
     return convert(st.get("sched_arrive_early")), convert(st.get("sched_arrive_late"))
 
 
-def _extract_stops(order: Dict[str, Any]) -> List[Dict[str, Any]]:
-    stops = order.get("stops") or []
+def _scan_stops(stops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Walk the order's stops once and collect every stop-derived Load Event field.
+
+    Returns a dict with equipment, weight, pickup_number, po_number,
+    sale_notes and stops_out (the mapped Load Event stops).
+    """
+    equipment: Optional[str] = None
+    weight: Optional[float] = None
+    pickup_number: Optional[str] = None
+    po_number: Optional[str] = None
+    sale_notes: Optional[str] = None
+    result: List[Dict[str, Any]] = []
     if not stops:
-        return []
+        return {
+            "equipment": equipment,
+            "weight": weight,
+            "pickup_number": pickup_number,
+            "po_number": po_number,
+            "sale_notes": sale_notes,
+            "stops_out": result,
+        }
     
-    # First pass: identify which SO is the last one (for destination)
+    # Position in result of the latest SO; it is promoted to destination after the loop
     last_so_idx = -1
-    for idx in range(len(stops) - 1, -1, -1):
-        st_type_raw = str(stops[idx].get("stop_type") or "").upper()
-        if st_type_raw in ("SO", "DESTINATION"):
-            last_so_idx = idx
-            break
-    
-    result: List[Dict[str, Any]] = []
     origin_found = False
+    destination_found = False
+    max_order = 0
+    pu_notes_seen = False
     
     for idx, st in enumerate(stops):
         st_type_raw = str(st.get("stop_type") or "").upper()
+
+        # Reference numbers: Equipment Initial, pickup (order) and PO numbers
+        if equipment is None or not pickup_number or not po_number:
+            for ref in (st.get("referenceNumbers") or []):
+                val = ref.get("reference_number")
+                if not val:
+                    continue
+                if equipment is None and ref.get("__referenceQualDescr") == "Equipment Initial":
+                    equipment = str(val).strip()
+                qual = (ref.get("reference_qual") or ref.get("__referenceQualDescr") or "").upper()
+                if qual in _PICKUP_QUALS and not pickup_number:
+                    pickup_number = str(val)
+                if qual in _PO_QUALS and not po_number:
+                    po_number = str(val)
+
+        # Weight from the first stop that carries one
+        if weight is None and st.get("weight") is not None:
+            try:
+                weight = float(st["weight"])
+            except Exception:
+                pass
+
+        # Sale notes: first PU stop notes concatenated (simple join) if available
+        if not pu_notes_seen and st_type_raw in _PU_TYPES:
+            pu_notes_seen = True
+            texts = [str(n.get("comments")) for n in (st.get("stopNotes") or []) if n.get("comments")]
+            if texts:
+                # Limit size to prevent huge payloads
+                sale_notes = " \n".join(texts)[:2000]
         
         # Map stop types - handle multiple PU/SO stops
-        if st_type_raw in ("PU", "ORIGIN"):
+        if st_type_raw in _PU_TYPES:
             # First PU becomes origin, subsequent PUs become pick
             if not origin_found:
                 st_type = "origin"
                 origin_found = True
             else:
                 st_type = "pick"
-        elif st_type_raw in ("SO", "DESTINATION"):
+        elif st_type_raw in _SO_TYPES:
             # Last SO becomes destination, earlier SOs become drop
-            if idx == last_so_idx:
-                st_type = "destination"
-            else:
-                st_type = "drop"
-        elif st_type_raw in ("PICK", "P"):
+            st_type = "drop"
+            last_so_idx = len(result)
+        elif st_type_raw in _PICK_TYPES:
             st_type = "pick"
-        elif st_type_raw in ("DROP", "D"):
+        elif st_type_raw in _DROP_TYPES:
             st_type = "drop"
         else:
             # For unknown types, infer based on position:
@@ -611,6 +691,7 @@ def _extract_stops(order: Dict[str, Any]) -> List[Dict[str, Any]]:
                 origin_found = True
             elif idx == len(stops) - 1 and last_so_idx == -1:
                 st_type = "destination"
+                destination_found = True
             else:
                 # Default unknown types to pick
                 st_type = "pick"
@@ -625,16 +706,12 @@ def _extract_stops(order: Dict[str, Any]) -> List[Dict[str, Any]]:
                 stop_order = int(stop_order)
             except (ValueError, TypeError):
                 stop_order = idx + 1
+        if idx == 0 or stop_order > max_order:
+            max_order = stop_order
         
         stop_obj: Dict[str, Any] = {
             "type": st_type,
-            "location": {
-                "city": st.get("city_name") or st.get("city"),
-                "state": st.get("state"),
-                "zip": st.get("zip_code") or st.get("zip"),
-                "country": "US",
-                "address": st.get("address"),
-            },
+            "location": _to_loc(st),
             "stop_order": stop_order,
         }
         if open_ts:
@@ -648,61 +725,42 @@ def _extract_stops(order: Dict[str, Any]) -> List[Dict[str, Any]]:
 
         result.append(stop_obj)
 
+    if last_so_idx != -1:
+        result[last_so_idx]["type"] = "destination"
+        destination_found = True
+
     # Ensure origin and destination exist if possible
-    if not any(s["type"] == "origin" for s in result) and stops:
+    if not origin_found:
         first = stops[0]
         open_ts, close_ts = _format_window(first)
         result.insert(0, {
             "type": "origin",
-            "location": {
-                "city": first.get("city_name") or first.get("city"),
-                "state": first.get("state"),
-                "zip": first.get("zip_code") or first.get("zip"),
-                "country": "US",
-                "address": first.get("address"),
-            },
+            "location": _to_loc(first),
             "stop_order": 1,
             **({"stop_timestamp_open": open_ts} if open_ts else {}),
             **({"stop_timestamp_close": close_ts} if close_ts else {}),
         })
+        max_order = max(max_order, 1)
 
-    if not any(s["type"] == "destination" for s in result) and stops:
+    if not destination_found:
         last = stops[-1]
         open_ts, close_ts = _format_window(last)
         result.append({
             "type": "destination",
-            "location": {
-                "city": last.get("city_name") or last.get("city"),
-                "state": last.get("state"),
-                "zip": last.get("zip_code") or last.get("zip"),
-                "country": "US",
-                "address": last.get("address"),
-            },
-            "stop_order": max((s.get("stop_order", 0) for s in result), default=1) + 1,
+            "location": _to_loc(last),
+            "stop_order": max_order + 1,
             **({"stop_timestamp_open": open_ts} if open_ts else {}),
             **({"stop_timestamp_close": close_ts} if close_ts else {}),
         })
 
-    return result
-
-
-def _extract_reference_numbers(order: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
-    """Return (pickup_number, po_number) from referenceNumbers by qualifiers."""
-    pickup = None
-    po = None
-    for st in (order.get("stops") or []):
-        for ref in (st.get("referenceNumbers") or []):
-            qual = (ref.get("reference_qual") or ref.get("__referenceQualDescr") or "").upper()
-            val = ref.get("reference_number")
-            if not val:
-                continue
-            if qual in ("OQ", "ORDER NUMBER") and not pickup:
-                pickup = str(val)
-            if qual in ("PO", "PURCHASE ORDER NUMBER") and not po:
-                po = str(val)
-        if pickup and po:
-            break
-    return pickup, po
+    return {
+        "equipment": equipment,
+        "weight": weight,
+        "pickup_number": pickup_number,
+        "po_number": po_number,
+        "sale_notes": sale_notes,
+        "stops_out": result,
+    }
 
 
 def _extract_overall_windows(origin: Optional[Dict[str, Any]], destination: Optional[Dict[str, Any]], stops: List[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
@@ -730,35 +788,11 @@ def _extract_contacts(order: Dict[str, Any]) -> List[Dict[str, Any]]:
             contacts.append({
                 "name": name or "",
                 "email": email or "",
-                "phone": (str(phone).replace("-", "").replace(" ", "") if phone else ""),
+                "phone": (str(phone).translate(_PHONE_STRIP) if phone else ""),
                 "type": "assigned",
             })
     return contacts
 
 
-def _extract_power_units(order: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
-    mvts = order.get("movement") or []
-    if mvts and isinstance(mvts, list):
-        m = (mvts[0] or {})
-        return (m.get("carrier_tractor"), m.get("carrier_trailer"))
-    return None, None
-
-
-def _extract_sale_notes(order: Dict[str, Any]) -> Optional[str]:
-    # Use first PU stop notes concatenated (simple join) if available
-    stops = order.get("stops") or []
-    for st in stops:
-        st_type = (st.get("stop_type") or "").upper()
-        if st_type in ("PU", "ORIGIN"):
-            notes = st.get("stopNotes") or []
-            texts = []
-            for n in notes:
-                c = n.get("comments")
-                if c:
-                    texts.append(str(c))
-            if texts:
-                # Limit size to prevent huge payloads
-                joined = " \n".join(texts)
-                return joined[:2000]
-            break
-    return None
+def _extract_power_units(mvt0: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    return (mvt0.get("carrier_tractor"), mvt0.get("carrier_trailer"))
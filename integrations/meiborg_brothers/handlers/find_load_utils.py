@@ -3,105 +3,100 @@
 from typing import Dict, Any, List, Optional
 
 
+# McLeod stop_type -> find_load stop type (anything else is "other")
+_STOP_TYPE_MAP = {
+    "PU": "pickup", "ORIGIN": "pickup",
+    "SO": "delivery", "DESTINATION": "delivery",
+    "PICK": "pick", "P": "pick",
+    "DROP": "drop", "D": "drop",
+}
+
+
 # -----------------------------
 # Safe helpers
 # -----------------------------
 
+_MISSING = object()
+
+
 def safe_get(obj: Any, *keys, default=None):
-    """Safely traverse nested dict/list structure."""
+    """Safely traverse nested dict/list structure (plain JSON dicts and lists)."""
     cur = obj
-    try:
-        for k in keys:
-            if isinstance(k, int):
-                if isinstance(cur, list) and 0 <= k < len(cur):
-                    cur = cur[k]
-                else:
-                    return default
+    for k in keys:
+        if isinstance(k, int):
+            if type(cur) is list and 0 <= k < len(cur):
+                cur = cur[k]
             else:
-                if isinstance(cur, dict) and k in cur:
-                    cur = cur[k]
-                else:
-                    return default
-        return cur if cur is not None else default
-    except Exception:
-        return default
+                return default
+        elif type(cur) is dict:
+            cur = cur.get(k, _MISSING)
+            if cur is _MISSING:
+                return default
+        else:
+            return default
+    return default if cur is None else cur
 
 
 def format_timestamp(raw: Optional[str]) -> Optional[str]:
     """Convert McLeod timestamps (YYYYMMDDHHMMSS-0600) into ISO8601 without timezone."""
-    if not raw or not isinstance(raw, str):
-        return None
-    core = raw.split("-")[0]
-    if len(core) < 14:
-        return None
-    try:
-        return f"{core[0:4]}-{core[4:6]}-{core[6:8]}T{core[8:10]}:{core[10:12]}:{core[12:14]}"
-    except Exception:
+    # The first 14 chars must be the timestamp itself (no "-" offset inside them)
+    if not raw or not isinstance(raw, str) or len(raw) < 14 or raw.find("-", 0, 14) != -1:
         return None
+    return f"{raw[:4]}-{raw[4:6]}-{raw[6:8]}T{raw[8:10]}:{raw[10:12]}:{raw[12:14]}"
+
+
+def _raw_timestamp(raw: Optional[str]) -> Optional[str]:
+    """Identity stand-in for format_timestamp when format_ts is False."""
+    return raw
 
 
 # -----------------------------
 # Stop extraction
 # -----------------------------
 
-def extract_pickup_and_delivery(order: Dict[str, Any]):
-    """Identify pickup and delivery stops using heuristics."""
-    stops = safe_get(order, "stops", default=[]) or []
-    pickup = None
-    delivery = None
-
-    for st in stops:
-        st_type = (st.get("stop_type") or "").upper()
-        if not pickup and st_type in ("PU", "ORIGIN"):
-            pickup = st
-        if st_type in ("SO", "DESTINATION"):
-            delivery = st
-
-    if not pickup and stops:
-        pickup = stops[0]
-    if not delivery and stops:
-        delivery = stops[-1]
-
-    return pickup, delivery
-
-
 def map_stop(stop: Dict[str, Any], format_ts: bool = True) -> Dict[str, Any]:
     """Convert a raw stop record into a formatted stop dictionary."""
-    ts = format_timestamp if format_ts else (lambda x: x)
+    ts = format_timestamp if format_ts else _raw_timestamp
 
     st_type_raw = (stop.get("stop_type") or "").upper()
-    if st_type_raw in ("PU", "ORIGIN"):
-        stop_type = "pickup"
-    elif st_type_raw in ("SO", "DESTINATION"):
-        stop_type = "delivery"
-    elif st_type_raw in ("PICK", "P"):
-        stop_type = "pick"
-    elif st_type_raw in ("DROP", "D"):
-        stop_type = "drop"
-    else:
-        stop_type = "other"
+    stop_type = _STOP_TYPE_MAP.get(st_type_raw, "other")
 
     return {
         "type": stop_type,
-        "location_name": safe_get(stop, "location_name"),
-        "address": safe_get(stop, "address"),
-        "city": safe_get(stop, "city_name"),
-        "state": safe_get(stop, "state"),
-        "zip": safe_get(stop, "zip_code"),
-        "phone": safe_get(stop, "phone"),
-        "scheduled_early": ts(safe_get(stop, "sched_arrive_early")),
-        "scheduled_late": ts(safe_get(stop, "sched_arrive_late")),
-        "actual_arrival": ts(safe_get(stop, "actual_arrival")),
-        "status": safe_get(stop, "__statusDescr"),
-        "load_type": safe_get(stop, "__loadUnloadDescr"),
+        "location_name": stop.get("location_name"),
+        "address": stop.get("address"),
+        "city": stop.get("city_name"),
+        "state": stop.get("state"),
+        "zip": stop.get("zip_code"),
+        "phone": stop.get("phone"),
+        "scheduled_early": ts(stop.get("sched_arrive_early")),
+        "scheduled_late": ts(stop.get("sched_arrive_late")),
+        "actual_arrival": ts(stop.get("actual_arrival")),
+        "status": stop.get("__statusDescr"),
+        "load_type": stop.get("__loadUnloadDescr"),
         "stop_order": (
-            safe_get(stop, "order_sequence")
-            or safe_get(stop, "movement_sequence")
+            stop.get("order_sequence")
+            or stop.get("movement_sequence")
             or 0
         ),
     }
 
 
+# map_stop keys carried into the payload's pickup/delivery blocks
+_LOCATION_KEYS = (
+    "location_name", "address", "city", "state", "zip", "phone",
+    "scheduled_early", "scheduled_late", "actual_arrival", "status", "load_type",
+)
+
+
+def _stop_location(stops: List[Dict[str, Any]], idx: Optional[int]) -> Dict[str, Any]:
+    """Copy the location fields of an already-mapped stop (all None if there is no stop)."""
+    if idx is None:
+        return dict.fromkeys(_LOCATION_KEYS)
+    mapped = stops[idx]
+    return {k: mapped[k] for k in _LOCATION_KEYS}
+
+
 # -----------------------------
 # Main mapping function
 # -----------------------------
@@ -117,68 +112,58 @@ def map_find_load_payload(mcleod_data: Dict[str, Any], format_ts: bool = True) -
     """
     order = mcleod_data or {}
 
-    pickup, delivery = extract_pickup_and_delivery(order)
-
-    # Map all stops
-    stops_raw = safe_get(order, "stops", default=[]) or []
-    stops = [map_stop(st, format_ts=format_ts) for st in stops_raw]
+    # Map all stops, noting the pickup (first PU) and delivery (last SO) on the way
+    stops_raw = order.get("stops") or []
+    stops = []
+    pickup_idx = delivery_idx = None
+    for idx, st in enumerate(stops_raw):
+        mapped = map_stop(st, format_ts=format_ts)
+        stops.append(mapped)
+        if mapped["type"] == "pickup":
+            if pickup_idx is None:
+                pickup_idx = idx
+        elif mapped["type"] == "delivery":
+            delivery_idx = idx
+
+    # No PU/SO stop: fall back to the first/last stop
+    if stops_raw:
+        if pickup_idx is None:
+            pickup_idx = 0
+        if delivery_idx is None:
+            delivery_idx = len(stops_raw) - 1
+    p = (stops_raw[pickup_idx] if pickup_idx is not None else None) or {}
 
     payload = {
-        "load_number": safe_get(order, "id"),
-        "status": safe_get(order, "__statusDescr"),
-        "equipment_type": safe_get(order, "__equipmentTypeDescr"),
-
-        "weight": safe_get(order, "weight"),
-        "weight_unit": safe_get(order, "weight_um"),
-        "pieces": safe_get(order, "pieces"),
-        "cases": safe_get(pickup or {}, "cases"),
-        "pallets": safe_get(order, "pallets_how_many"),
-        "commodity": safe_get(order, "commodity"),
-
-        "distance": safe_get(order, "bill_distance"),
-        "distance_unit": safe_get(order, "bill_distance_um"),
-
-        "bol_number": safe_get(order, "blnum"),
-        "shipment_id": safe_get(order, "shipment_id"),
-
-        "pickup": {
-            "location_name": safe_get(pickup or {}, "location_name"),
-            "address": safe_get(pickup or {}, "address"),
-            "city": safe_get(pickup or {}, "city_name"),
-            "state": safe_get(pickup or {}, "state"),
-            "zip": safe_get(pickup or {}, "zip_code"),
-            "phone": safe_get(pickup or {}, "phone"),
-            "scheduled_early": (format_timestamp if format_ts else lambda x: x)(safe_get(pickup or {}, "sched_arrive_early")),
-            "scheduled_late": (format_timestamp if format_ts else lambda x: x)(safe_get(pickup or {}, "sched_arrive_late")),
-            "actual_arrival": (format_timestamp if format_ts else lambda x: x)(safe_get(pickup or {}, "actual_arrival")),
-            "status": safe_get(pickup or {}, "__statusDescr"),
-            "load_type": safe_get(pickup or {}, "__loadUnloadDescr"),
-        },
+        "load_number": order.get("id"),
+        "status": order.get("__statusDescr"),
+        "equipment_type": order.get("__equipmentTypeDescr"),
 
-        "delivery": {
-            "location_name": safe_get(delivery or {}, "location_name"),
-            "address": safe_get(delivery or {}, "address"),
-            "city": safe_get(delivery or {}, "city_name"),
-            "state": safe_get(delivery or {}, "state"),
-            "zip": safe_get(delivery or {}, "zip_code"),
-            "phone": safe_get(delivery or {}, "phone"),
-            "scheduled_early": (format_timestamp if format_ts else lambda x: x)(safe_get(delivery or {}, "sched_arrive_early")),
-            "scheduled_late": (format_timestamp if format_ts else lambda x: x)(safe_get(delivery or {}, "sched_arrive_late")),
-            "actual_arrival": (format_timestamp if format_ts else lambda x: x)(safe_get(delivery or {}, "actual_arrival")),
-            "status": safe_get(delivery or {}, "__statusDescr"),
-            "load_type": safe_get(delivery or {}, "__loadUnloadDescr"),
-        },
+        "weight": order.get("weight"),
+        "weight_unit": order.get("weight_um"),
+        "pieces": order.get("pieces"),
+        "cases": p.get("cases"),
+        "pallets": order.get("pallets_how_many"),
+        "commodity": order.get("commodity"),
+
+        "distance": order.get("bill_distance"),
+        "distance_unit": order.get("bill_distance_um"),
+
+        "bol_number": order.get("blnum"),
+        "shipment_id": order.get("shipment_id"),
+
+        "pickup": _stop_location(stops, pickup_idx),
+        "delivery": _stop_location(stops, delivery_idx),
 
         "stops": stops,
 
         "customer": {
-            "id": safe_get(order, "customer_id"),
+            "id": order.get("customer_id"),
             "name": safe_get(order, "customer", "name"),
         },
 
-        "ordered_date": safe_get(order, "ordered_date"),
+        "ordered_date": order.get("ordered_date"),
         "brokerage": safe_get(order, "movement", 0, "brokerage"),
-        "notes": safe_get(order, "planning_comment"),
+        "notes": order.get("planning_comment"),
 
         "internal_next_steps": (
             "1. Pitch the load with details: equipment, pickup, delivery, stops, distance, weight, commodity.\n\n"
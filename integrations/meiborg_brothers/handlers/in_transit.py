@@ -1,44 +1,103 @@
 """Handler for in-transit load check-ins (morning and afternoon calls)."""
 
+import hashlib
 import json
-import os
-from typing import Dict, Any, List
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from handlers.utils import fetch_orders, normalize_response_to_list, send_webhook
+from handlers.config import get_config
+from handlers.utils import WEBHOOK_MAX_WORKERS, fetch_orders, orders_from_response, send_webhook
 
 
-def is_in_transit(order: Dict) -> bool:
-    """Check if order is in transit (picked up but not delivered)."""
-    stops = order.get("stops", [])
-    
-    # Need at least 2 stops
+logger = logging.getLogger(__name__)
+
+_CENTRAL_TZ = ZoneInfo("America/Chicago")
+
+# Parsed order lists reused by back-to-back runs in the same (warm) process,
+# keyed by (base_url, start bucket, end bucket, token type, token hash) ->
+# (monotonic fetch time, orders); window bounds are floored to the TTL so
+# runs a few minutes apart share an entry
+ORDERS_CACHE_TTL_SECONDS = 300
+_orders_cache: Dict[Tuple[str, int, int, str, str], Tuple[float, List[Dict]]] = {}
+
+
+# _classify reason codes
+_NOT_IN_TRANSIT = "not_in_transit"
+_NOT_TRANSIT_STATUS = "not_transit_status"
+
+
+def _classify(order: Dict) -> Tuple[Optional[str], Any, Optional[Dict], Optional[Dict]]:
+    """
+    Run both in-transit filters in one pass.
+
+    - In transit: at least 2 stops, first stop arrived, last stop not arrived
+    - First movement has brokerage_status = TRANSIT
+
+    Returns (reason, movement, first_stop, last_stop); reason is None when the
+    order passes, otherwise the reason code of the first failing filter.
+    """
+    stops = order.get("stops") or []
     if len(stops) < 2:
-        return False
-    
-    first_stop = stops[0]
-    last_stop = stops[-1]
-    
-    # Must have pickup, no delivery
-    has_pickup = bool(first_stop.get("actual_arrival"))
-    has_delivery = bool(last_stop.get("actual_arrival"))
-    
-    return has_pickup and not has_delivery
+        return _NOT_IN_TRANSIT, None, None, None
+    first_stop, last_stop = stops[0], stops[-1]
+    if not first_stop.get("actual_arrival") or last_stop.get("actual_arrival"):
+        return _NOT_IN_TRANSIT, None, first_stop, last_stop
 
+    movements = order.get("movement") or []
+    movement = (movements[0] if movements else None) if isinstance(movements, list) else movements
+    if not movement or movement.get("brokerage_status") != "TRANSIT":
+        return _NOT_TRANSIT_STATUS, movement, first_stop, last_stop
+
+    return None, movement, first_stop, last_stop
+
+
+def _window_bucket(param: str) -> int:
+    """Floor a McLeod 'YYYYMMDD HHMM' window bound to its ORDERS_CACHE_TTL_SECONDS bucket."""
+    dt = datetime.strptime(param, "%Y%m%d %H%M")
+    return int((dt - datetime(1970, 1, 1)).total_seconds()) // ORDERS_CACHE_TTL_SECONDS
 
-def passes_brokerage_status_filter(order: Dict) -> bool:
-    """Check if order has brokerage_status = TRANSIT."""
-    movements = order.get("movement", [])
-    
-    if not movements:
-        return False
-    
-    # Check first movement's brokerage_status
-    movement = movements[0] if isinstance(movements, list) else movements
-    brokerage_status = movement.get("brokerage_status")
-    
-    return brokerage_status == "TRANSIT"
+
+def fetch_orders_cached(
+    base_url: str,
+    auth_token: str,
+    token_type: str,
+    start_param: str,
+    end_param: str,
+    prefix: str = ""
+) -> Tuple[Optional[List[Dict]], Any]:
+    """
+    fetch_orders + orders_from_response, reusing a list fetched from the
+    same URL and credentials, for the same window bucket, within
+    ORDERS_CACHE_TTL_SECONDS. Expired entries are dropped on every store.
+
+    Returns (orders, None) on success, or (None, resp) for a non-200 response.
+    """
+    key = (
+        base_url,
+        _window_bucket(start_param),
+        _window_bucket(end_param),
+        token_type,
+        hashlib.sha256((auth_token or "").encode()).hexdigest(),
+    )
+    now = time.monotonic()
+    cached = _orders_cache.get(key)
+    if cached and now - cached[0] < ORDERS_CACHE_TTL_SECONDS:
+        logger.info("%sReusing %d orders fetched %ds ago", prefix, len(cached[1]), int(now - cached[0]))
+        return cached[1], None
+
+    resp = fetch_orders(base_url, auth_token, token_type, start_param, end_param, prefix)
+    if resp.status_code != 200:
+        return None, resp
+    orders = orders_from_response(resp)
+    now = time.monotonic()
+    for stale_key in [k for k, (fetched_at, _) in _orders_cache.items() if now - fetched_at >= ORDERS_CACHE_TTL_SECONDS]:
+        del _orders_cache[stale_key]
+    _orders_cache[key] = (now, orders)
+    return orders, None
 
 
 def process_in_transit_orders(
@@ -54,46 +113,45 @@ def process_in_transit_orders(
     Filters:
     - Must be in transit (picked up, not delivered)
     - Must have brokerage_status = TRANSIT
+
+    Webhooks for the orders that pass are sent concurrently; results keep
+    the input order.
     """
-    results = []
+    results: List[Optional[Dict]] = []
+    pending: List[Tuple[int, Any, Dict]] = []  # (results index, order_id, payload)
     
     for order in orders:
         try:
             order_id = order.get("id", "unknown")
             
+            reason, movement, first_stop, last_stop = _classify(order)
+            
             # Filter 1: In-transit status
-            if not is_in_transit(order):
-                print(f"{prefix}Order {order_id} - Not in transit, skipping")
+            if reason == _NOT_IN_TRANSIT:
+                logger.debug("%sOrder %s - Not in transit, skipping", prefix, order_id)
                 continue
             
             # Filter 2: Brokerage status = TRANSIT
-            if not passes_brokerage_status_filter(order):
-                brokerage_status = order.get("movement", [{}])[0].get("brokerage_status", "unknown")
-                print(f"{prefix}Order {order_id} - Brokerage status '{brokerage_status}' != TRANSIT, skipping")
+            if reason == _NOT_TRANSIT_STATUS:
+                brokerage_status = movement.get("brokerage_status", "unknown") if movement else "unknown"
+                logger.debug("%sOrder %s - Brokerage status '%s' != TRANSIT, skipping", prefix, order_id, brokerage_status)
                 continue
             
-            print(f"{prefix}Order {order_id} - In transit with TRANSIT status, sending {call_type} call webhook")
+            logger.info("%sOrder %s - In transit with TRANSIT status, sending %s call webhook", prefix, order_id, call_type)
             
-            # Get order details
-            stops = order.get("stops", [])
-            first_stop = stops[0]
-            last_stop = stops[-1]
-            
-            # Get movement_id, phone numbers, and equipment info
-            movements = order.get("movement", [])
-            movement = movements[0] if isinstance(movements, list) else movements
-            movement_id = movement.get("id") if movement else None
-            driver_phone = movement.get("override_drvr_cell", "") if movement else ""
-            dispatch_phone = movement.get("carrier_phone", "") if movement else ""
-            carrier_tractor = movement.get("carrier_tractor", "") if movement else ""
-            carrier_trailer = movement.get("carrier_trailer", "") if movement else ""
+            # Get movement_id, phone numbers, and equipment info (movement is set once classified)
+            movement_id = movement.get("id")
+            driver_phone = movement.get("override_drvr_cell", "")
+            dispatch_phone = movement.get("carrier_phone", "")
+            carrier_tractor = movement.get("carrier_tractor", "")
+            carrier_trailer = movement.get("carrier_trailer", "")
             
             # Filter 3: At least one phone number must exist
             if not driver_phone and not dispatch_phone:
-                print(f"{prefix}Order {order_id} - Missing both phone numbers, skipping")
+                logger.debug("%sOrder %s - Missing both phone numbers, skipping", prefix, order_id)
                 continue
             
-            # Send webhook with minimal payload
+            # Queue webhook with minimal payload
             payload = {
                 "order_id": order_id,
                 "movement_id": movement_id,
@@ -102,14 +160,11 @@ def process_in_transit_orders(
                 "carrier_tractor": carrier_tractor,
                 "carrier_trailer": carrier_trailer
             }
-            
-            result = send_webhook(webhook_url, payload, prefix)
-            result["order_id"] = order_id
-            result["call_type"] = call_type
-            results.append(result)
+            pending.append((len(results), order_id, payload))
+            results.append(None)
             
         except Exception as e:
-            print(f"{prefix}Error processing order {order.get('id', 'unknown')}: {e}")
+            logger.error("%sError processing order %s: %s", prefix, order.get("id", "unknown"), e)
             results.append({
                 "order_id": order.get("id", "unknown"),
                 "call_type": call_type,
@@ -117,6 +172,15 @@ def process_in_transit_orders(
                 "success": False
             })
     
+    # Send queued webhooks concurrently (I/O bound)
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(WEBHOOK_MAX_WORKERS, len(pending))) as pool:
+            sent = pool.map(lambda item: send_webhook(webhook_url, item[2], prefix), pending)
+            for (idx, order_id, _), result in zip(pending, sent):
+                result["order_id"] = order_id
+                result["call_type"] = call_type
+                results[idx] = result
+    
     return results
 
 
@@ -139,13 +203,14 @@ def in_transit_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         query_params = event.get("queryStringParameters") or {}
         call_type = query_params.get("call_type", "morning")
         
-        print(f"Running Meiborg Brothers in-transit check-in ({call_type} call)")
+        logger.info("Running Meiborg Brothers in-transit check-in (%s call)", call_type)
         
         # Get configuration
-        base_url = os.getenv("MCLEOD_BASE_URL")
-        auth_token = os.getenv("MCLEOD_AUTH_TOKEN")
-        token_type = os.getenv("MCLEOD_AUTH_TYPE", "Bearer")
-        webhook_url = os.getenv("IN_TRANSIT_WEBHOOK_URL")
+        config = get_config()
+        base_url = config.mcleod_base_url
+        auth_token = config.mcleod_auth_token
+        token_type = config.mcleod_auth_type
+        webhook_url = config.in_transit_webhook_url
         
         if not base_url or not auth_token or not webhook_url:
             return {
@@ -156,15 +221,18 @@ def in_transit_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             }
         
         # Calculate time window (last 7 days to catch multi-day transits)
-        central_tz = ZoneInfo("America/Chicago")
-        now = datetime.now(central_tz)
+        now = datetime.now(_CENTRAL_TZ)
         start_time = now - timedelta(days=7)
         
         # Format time parameters for McLeod API
         start_param = start_time.strftime('%Y%m%d %H%M')
         end_param = now.strftime('%Y%m%d %H%M')
         
-        print(f"Querying orders from last 7 days: {start_time.strftime('%Y-%m-%d %H:%M')} to {now.strftime('%Y-%m-%d %H:%M')} Central")
+        logger.info(
+            "Querying orders from last 7 days: %s to %s Central",
+            start_time.strftime("%Y-%m-%d %H:%M"),
+            now.strftime("%Y-%m-%d %H:%M"),
+        )
         
         # Process production environment
         results = []
@@ -173,46 +241,44 @@ def in_transit_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         if webhook_url != "N/A":
             try:
-                resp = fetch_orders(base_url, auth_token, token_type, start_param, end_param)
-                if resp.status_code == 200:
-                    orders = normalize_response_to_list(resp.json())
+                orders, resp = fetch_orders_cached(base_url, auth_token, token_type, start_param, end_param)
+                if orders is not None:
                     orders_checked = len(orders)
-                    print(f"Fetched {orders_checked} orders, filtering for in-transit with TRANSIT status")
+                    logger.info("Fetched %d orders, filtering for in-transit with TRANSIT status", orders_checked)
                     results = process_in_transit_orders(orders, webhook_url, call_type, now)
                 else:
-                    print(f"API request failed with status {resp.status_code}: {resp.text}")
+                    logger.error("API request failed with status %s: %s", resp.status_code, resp.text)
                     production_error = f"API returned status {resp.status_code}"
             except Exception as e:
-                print(f"Error fetching production orders: {e}")
+                logger.error("Error fetching production orders: %s", e)
                 production_error = str(e)
         
         # Process TRN (staging environment)
         trn_results = []
         trn_orders_checked = 0
         trn_error = None
-        trn_base_url = os.getenv("TRN_MCLEOD_BASE_URL")
-        trn_webhook_url = os.getenv("TRN_IN_TRANSIT_WEBHOOK_URL")
+        trn_base_url = config.trn_mcleod_base_url
+        trn_webhook_url = config.trn_in_transit_webhook_url
         
         if trn_base_url and trn_webhook_url:
             try:
-                trn_resp = fetch_orders(
+                trn_orders, trn_resp = fetch_orders_cached(
                     trn_base_url,
-                    os.getenv("TRN_MCLEOD_AUTH_TOKEN"),
-                    os.getenv("TRN_MCLEOD_AUTH_TYPE", "Bearer"),
+                    config.trn_mcleod_auth_token,
+                    config.trn_mcleod_auth_type,
                     start_param,
                     end_param,
                     "TRN - "
                 )
-                if trn_resp.status_code == 200:
-                    trn_orders = normalize_response_to_list(trn_resp.json())
+                if trn_orders is not None:
                     trn_orders_checked = len(trn_orders)
-                    print(f"TRN - Fetched {trn_orders_checked} orders, filtering for in-transit with TRANSIT status")
+                    logger.info("TRN - Fetched %d orders, filtering for in-transit with TRANSIT status", trn_orders_checked)
                     trn_results = process_in_transit_orders(trn_orders, trn_webhook_url, call_type, now, "TRN - ")
                 else:
-                    print(f"TRN - API request failed with status {trn_resp.status_code}: {trn_resp.text}")
+                    logger.error("TRN - API request failed with status %s: %s", trn_resp.status_code, trn_resp.text)
                     trn_error = f"API returned status {trn_resp.status_code}"
             except Exception as e:
-                print(f"TRN - Error fetching orders: {e}")
+                logger.error("TRN - Error fetching orders: %s", e)
                 trn_error = str(e)
         
         # Build response
@@ -220,11 +286,11 @@ def in_transit_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             "message": "Success!",
             "call_type": call_type,
             "orders_checked": orders_checked,
-            "in_transit_found": len([r for r in results if r.get("success")]),
+            "in_transit_found": sum(1 for r in results if r.get("success")),
             "webhooks_sent": len(results),
             "webhook_results": results,
             "trn_orders_checked": trn_orders_checked,
-            "trn_in_transit_found": len([r for r in trn_results if r.get("success")]),
+            "trn_in_transit_found": sum(1 for r in trn_results if r.get("success")),
             "trn_webhooks_sent": len(trn_results),
             "trn_webhook_results": trn_results,
         }
@@ -240,7 +306,5 @@ def in_transit_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
     
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error: %s", e)
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
@@ -5,26 +5,41 @@ sends webhook to trigger pre-pickup calls.
 """
 
 import json
-import os
+import logging
 import re
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, List, Optional, Set
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
-from handlers.utils import send_webhook
-from handlers.redis_client import has_been_called, mark_as_called
-import requests
+from handlers.config import get_config
+from handlers.utils import SESSION, WEBHOOK_MAX_WORKERS, orders_from_response, parse_pickup_time, send_webhook
+from handlers.redis_client import claim_call, has_been_called_bulk, release_call
 
 
+logger = logging.getLogger(__name__)
+
+_EASTERN_TZ = ZoneInfo("America/New_York")
+_DEFAULT_TZ = _EASTERN_TZ  # Client is EST-based
+
+# McLeod __timezone abbreviation -> ZoneInfo, resolved once at import
 TIMEZONE_MAPPING = {
-    "EDT": "America/New_York", "EST": "America/New_York",
-    "CDT": "America/Chicago", "CST": "America/Chicago",
-    "MDT": "America/Denver", "MST": "America/Denver",
-    "PDT": "America/Los_Angeles", "PST": "America/Los_Angeles",
-    "HDT": "Pacific/Honolulu", "HST": "Pacific/Honolulu",
-    "AKDT": "America/Anchorage", "AKST": "America/Anchorage",
+    "EDT": _EASTERN_TZ, "EST": _EASTERN_TZ,
+    "CDT": ZoneInfo("America/Chicago"), "CST": ZoneInfo("America/Chicago"),
+    "MDT": ZoneInfo("America/Denver"), "MST": ZoneInfo("America/Denver"),
+    "PDT": ZoneInfo("America/Los_Angeles"), "PST": ZoneInfo("America/Los_Angeles"),
+    "HDT": ZoneInfo("Pacific/Honolulu"), "HST": ZoneInfo("Pacific/Honolulu"),
+    "AKDT": ZoneInfo("America/Anchorage"), "AKST": ZoneInfo("America/Anchorage"),
 }
 
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as ISO8601 with a Z suffix."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
 
 def fetch_orders_in_window(
     base_url: str,
@@ -53,8 +68,7 @@ def fetch_orders_in_window(
         List of order objects
     """
     # Calculate time window - use Eastern Time for McLeod queries
-    eastern_tz = ZoneInfo("America/New_York")
-    now = datetime.now(eastern_tz)
+    now = datetime.now(_EASTERN_TZ)
     
     # Query backward to catch loads in earlier timezones (e.g., PST)
     # A load at 12 PM PST appears as "120000" but equals 3 PM EST
@@ -80,27 +94,19 @@ def fetch_orders_in_window(
         "X-com.mcleodsoftware.CompanyID": company_id
     }
 
-    print(f"Querying McLeod: {url}")
+    logger.info("Querying McLeod: %s", url)
 
     try:
-        response = requests.get(url, headers=headers, timeout=90)
+        response = SESSION.get(url, headers=headers, timeout=90)
 
         if response.status_code == 200:
-            data = response.json()
-
-            # Normalize to list
-            if isinstance(data, list):
-                return data
-            elif isinstance(data, dict):
-                return [data]
-            else:
-                return []
+            return orders_from_response(response)
         else:
-            print(f"ERROR: McLeod API returned {response.status_code}: {response.text[:200]}")
+            logger.error("McLeod API returned %s: %s", response.status_code, response.text[:200])
             return []
 
     except Exception as e:
-        print(f"ERROR: Failed to fetch orders from McLeod: {e}")
+        logger.error("Failed to fetch orders from McLeod: %s", e)
         return []
 
 
@@ -116,8 +122,7 @@ def filter_orders_by_actual_window(orders: List[Dict[str, Any]], hours_ahead: in
         Filtered list of orders with pickups in the specified time window
     """
     # Use Eastern Time as base since client is EST-based
-    eastern_tz = ZoneInfo("America/New_York")
-    now = datetime.now(eastern_tz)
+    now = datetime.now(_EASTERN_TZ)
     end_time = now + timedelta(hours=hours_ahead)
     
     filtered = []
@@ -134,14 +139,11 @@ def filter_orders_by_actual_window(orders: List[Dict[str, Any]], hours_ahead: in
             
             # Parse with timezone from the stop's __timezone field
             tz_abbr = first_stop.get("__timezone")
-            tz_str = TIMEZONE_MAPPING.get(tz_abbr, "America/New_York")
-            
-            # Extract datetime part (before + or -)
-            dt_part = sched_arrive.split("+")[0] if "+" in sched_arrive else sched_arrive.split("-")[0]
-            pickup_time = datetime.strptime(dt_part, "%Y%m%d%H%M%S").replace(tzinfo=ZoneInfo(tz_str))
+            tz = TIMEZONE_MAPPING.get(tz_abbr, _DEFAULT_TZ)
+            pickup_time = parse_pickup_time(sched_arrive, tz)
             
             # Convert to Eastern Time for comparison
-            pickup_eastern = pickup_time.astimezone(eastern_tz)
+            pickup_eastern = pickup_time.astimezone(_EASTERN_TZ)
             
             # Only include if pickup is within our desired window (inclusive of end_time)
             # Using <= to include loads exactly 2 hours away
@@ -149,24 +151,36 @@ def filter_orders_by_actual_window(orders: List[Dict[str, Any]], hours_ahead: in
                 filtered.append(order)
                 
         except Exception as e:
-            print(f"Warning: Error filtering order {order.get('id', 'unknown')}: {e}")
+            logger.warning("Error filtering order %s: %s", order.get("id", "unknown"), e)
             continue
     
     return filtered
 
 
-def process_order(order: Dict[str, Any], webhook_url: str) -> Dict[str, Any]:
+def process_order(
+    order: Dict[str, Any],
+    webhook_url: str,
+    already_called: Optional[Set[str]] = None,
+    run_ts: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Process a single order - check Redis, send webhook if needed.
 
+    The order is marked as called in Redis (claim_call) before its webhook is
+    sent, and the mark is released if the webhook fails.
+
     Args:
         order: McLeod order object
         webhook_url: Webhook URL to send to
+        already_called: Pre-fetched set of called order IDs (see has_been_called_bulk),
+            skipped without a further Redis round-trip
+        run_ts: UTC ISO timestamp for the payload (see _utc_timestamp); defaults to now
 
     Returns:
         Result dict with order_id, success, and details
     """
     order_id = order.get("id", "unknown")
+    claimed = False
 
     try:
         # Get basic order info
@@ -192,10 +206,11 @@ def process_order(order: Dict[str, Any], webhook_url: str) -> Dict[str, Any]:
 
         # Parse pickup time
         tz_abbr = first_stop.get("__timezone")
-        tz_str = TIMEZONE_MAPPING.get(tz_abbr) if tz_abbr else "America/New_York"
+        tz = TIMEZONE_MAPPING.get(tz_abbr) if tz_abbr else _DEFAULT_TZ
+        if tz is None:
+            raise ValueError(f"Unknown timezone '{tz_abbr}'")
 
-        dt_part = sched_arrive_early.split("+")[0] if "+" in sched_arrive_early else sched_arrive_early.split("-")[0]
-        pickup_time = datetime.strptime(dt_part, "%Y%m%d%H%M%S").replace(tzinfo=ZoneInfo(tz_str))
+        pickup_time = parse_pickup_time(sched_arrive_early, tz)
 
         # Get movement info
         movement = movements[0] if isinstance(movements, list) else movements
@@ -213,13 +228,17 @@ def process_order(order: Dict[str, Any], webhook_url: str) -> Dict[str, Any]:
         if not driver_phone and not dispatch_phone:
             return {"order_id": order_id, "success": False, "reason": "no_phone"}
 
-        # Check Redis - have we already called this order?
-        if has_been_called(order_id):
+        # Check Redis - have we already called this order? Claiming marks it
+        # right away, so an overlapping run can't call it too
+        if already_called is not None and order_id in already_called:
             return {"order_id": order_id, "success": False, "reason": "already_called"}
+        if not claim_call(order_id, pickup_time.isoformat()):
+            return {"order_id": order_id, "success": False, "reason": "already_called"}
+        claimed = True
 
         # Clean phone numbers - remove all non-digit characters
-        driver_phone_clean = re.sub(r'\D', '', driver_phone) if driver_phone else None
-        dispatch_phone_clean = re.sub(r'\D', '', dispatch_phone) if dispatch_phone else None
+        driver_phone_clean = _NON_DIGIT_RE.sub("", driver_phone) if driver_phone else None
+        dispatch_phone_clean = _NON_DIGIT_RE.sub("", dispatch_phone) if dispatch_phone else None
 
         # Get delivery location (last stop)
         last_stop = stops[-1] if len(stops) > 1 else {}
@@ -247,15 +266,15 @@ def process_order(order: Dict[str, Any], webhook_url: str) -> Dict[str, Any]:
                 "address": last_stop.get("address")
             } if last_stop else None,
             "source": "peach_state_pre_pickup",
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": run_ts or _utc_timestamp()
         }
 
         # Send webhook
         webhook_result = send_webhook(webhook_url, payload)
 
-        # If webhook succeeded, mark as called in Redis
-        if webhook_result.get("success"):
-            mark_as_called(order_id, pickup_time.isoformat())
+        # If webhook failed, drop the mark so the next run retries the call
+        if not webhook_result.get("success"):
+            release_call(order_id)
 
         return {
             "order_id": order_id,
@@ -265,7 +284,9 @@ def process_order(order: Dict[str, Any], webhook_url: str) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        print(f"ERROR processing order {order_id}: {e}")
+        logger.error("Error processing order %s: %s", order_id, e)
+        if claimed:
+            release_call(order_id)
         return {"order_id": order_id, "success": False, "reason": f"error: {str(e)}"}
 
 
@@ -276,16 +297,15 @@ def pre_pickup_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Runs hourly to find orders with pickup in next 2 hours and send webhooks.
     """
     try:
-        print("=" * 60)
-        print("Running Peach State pre-pickup sync")
-        print("=" * 60)
+        logger.info("Running Peach State pre-pickup sync")
 
         # Get configuration
-        base_url = os.getenv("MCLEOD_BASE_URL")
-        auth_token = os.getenv("MCLEOD_AUTH_TOKEN")
-        token_type = os.getenv("MCLEOD_AUTH_TYPE", "Bearer")
-        company_id = os.getenv("MCLEOD_COMPANY_ID")
-        webhook_url = os.getenv("PRE_PICKUP_WEBHOOK_URL")
+        config = get_config()
+        base_url = config.mcleod_base_url
+        auth_token = config.mcleod_auth_token
+        token_type = config.mcleod_auth_type
+        company_id = config.mcleod_company_id
+        webhook_url = config.pre_pickup_webhook_url
 
         # Validate required config
         if not base_url or not auth_token:
@@ -308,38 +328,53 @@ def pre_pickup_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         # Fetch orders from McLeod - query wider window to handle timezone differences
         # Query 3 hours back to catch earlier timezones (PST) and 6 hours ahead
-        print(f"Fetching orders with pickup in wide time window (3 hours back + 6 hours ahead)...")
+        logger.info("Fetching orders with pickup in wide time window (3 hours back + 6 hours ahead)")
         orders = fetch_orders_in_window(base_url, auth_token, token_type, company_id, hours_behind=3, hours_ahead=6)
 
-        print(f"Found {len(orders)} orders in wide time window")
+        logger.info("Found %d orders in wide time window", len(orders))
         
         # Filter to actual 2-hour window using timezone-aware logic
         orders = filter_orders_by_actual_window(orders, hours_ahead=2)
         
-        print(f"After timezone-aware filtering: {len(orders)} orders in next 2 hours")
+        logger.info("After timezone-aware filtering: %d orders in next 2 hours", len(orders))
 
-        # Process each order
-        results = []
+        # Keep one entry per order id so concurrent workers can't call the same order twice
+        unique_orders = []
+        seen_ids: Set[str] = set()
         for order in orders:
-            result = process_order(order, webhook_url)
-            results.append(result)
+            order_id = order.get("id", "unknown")
+            if order_id not in seen_ids:
+                seen_ids.add(order_id)
+                unique_orders.append(order)
+        orders = unique_orders
+
+        # Check Redis for every candidate in one round-trip
+        already_called = has_been_called_bulk(order.get("id", "unknown") for order in orders)
+
+        # Process orders concurrently - each is dominated by its webhook round-trip
+        results = []
+        if orders:
+            process = partial(
+                process_order,
+                webhook_url=webhook_url,
+                already_called=already_called,
+                run_ts=_utc_timestamp(),
+            )
+            with ThreadPoolExecutor(max_workers=min(WEBHOOK_MAX_WORKERS, len(orders))) as pool:
+                results = list(pool.map(process, orders))
 
         # Summarize results
         total = len(results)
         success = sum(1 for r in results if r.get("success"))
-        already_called = sum(1 for r in results if r.get("reason") == "already_called")
+        already_called_count = sum(1 for r in results if r.get("reason") == "already_called")
         webhook_failed = sum(1 for r in results if r.get("reason") == "webhook_failed")
-        filtered = total - success - already_called - webhook_failed
-
-        print()
-        print("=" * 60)
-        print(f"SUMMARY:")
-        print(f"  Total orders found: {total}")
-        print(f"  Webhooks sent: {success}")
-        print(f"  Already called (skipped): {already_called}")
-        print(f"  Webhook failures: {webhook_failed}")
-        print(f"  Filtered out: {filtered}")
-        print("=" * 60)
+        filtered = total - success - already_called_count - webhook_failed
+
+        logger.info(
+            "Summary: %d orders found, %d webhooks sent, %d already called (skipped), "
+            "%d webhook failures, %d filtered out",
+            total, success, already_called_count, webhook_failed, filtered,
+        )
 
         return {
             "statusCode": 200,
@@ -347,7 +382,7 @@ def pre_pickup_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "message": "Pre-pickup sync completed",
                 "total_orders": total,
                 "webhooks_sent": success,
-                "already_called": already_called,
+                "already_called": already_called_count,
                 "webhook_failed": webhook_failed,
                 "filtered": filtered,
                 "results": results
@@ -355,9 +390,7 @@ def pre_pickup_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        print(f"CRITICAL ERROR in pre_pickup_handler: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Critical error in pre_pickup_handler: %s", e)
 
         return {
             "statusCode": 500,
@@ -1,27 +1,47 @@
 """Handler for pre-shipment load notifications (~2 hours before pickup)."""
 
 import json
-import os
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
-from handlers.utils import fetch_orders, normalize_response_to_list, send_webhook
+from handlers.config import get_config
+from handlers.utils import WEBHOOK_MAX_WORKERS, fetch_orders, orders_from_response, parse_pickup_time, send_webhook
 
 
+logger = logging.getLogger(__name__)
+
+
+# McLeod __timezone abbreviation -> ZoneInfo, resolved once at import
 TIMEZONE_MAPPING = {
-    "EDT": "America/New_York", "EST": "America/New_York",
-    "CDT": "America/Chicago", "CST": "America/Chicago",
-    "MDT": "America/Denver", "MST": "America/Denver",
-    "PDT": "America/Los_Angeles", "PST": "America/Los_Angeles",
-    "HDT": "Pacific/Honolulu", "HST": "Pacific/Honolulu",
-    "AKDT": "America/Anchorage", "AKST": "America/Anchorage",
+    "EDT": ZoneInfo("America/New_York"), "EST": ZoneInfo("America/New_York"),
+    "CDT": ZoneInfo("America/Chicago"), "CST": ZoneInfo("America/Chicago"),
+    "MDT": ZoneInfo("America/Denver"), "MST": ZoneInfo("America/Denver"),
+    "PDT": ZoneInfo("America/Los_Angeles"), "PST": ZoneInfo("America/Los_Angeles"),
+    "HDT": ZoneInfo("Pacific/Honolulu"), "HST": ZoneInfo("Pacific/Honolulu"),
+    "AKDT": ZoneInfo("America/Anchorage"), "AKST": ZoneInfo("America/Anchorage"),
 }
 
+PRE_SHIPMENT_SOURCE = "meiborg_load_sync_pre_shipment"
+
 
 def process_pre_shipment_orders(orders: List[Dict], webhook_url: str, prefix: str = "") -> List[Dict]:
-    """Process orders for pre-shipment notifications (~2 hours before pickup)."""
-    results = []
+    """
+    Process orders for pre-shipment notifications (~2 hours before pickup).
+
+    Webhooks (2-hour and 30-minute per order) are sent concurrently; results
+    keep the input order.
+    """
+    results: List[Optional[Dict]] = []
+    pending: List[Tuple[int, Dict, str]] = []  # (results index, payload, log prefix)
+    now_utc = datetime.now(timezone.utc)  # aware subtraction is tz-agnostic, so one "now" serves every order
+    run_timestamp = now_utc.isoformat().replace("+00:00", "Z")
+    # Calls later than this past their scheduled time are dropped
+    config = get_config()
+    late_2h_grace = config.late_2h_call_grace_seconds
+    late_30m_grace = config.late_30m_call_grace_seconds
     
     for order in orders:
         try:
@@ -30,49 +50,34 @@ def process_pre_shipment_orders(orders: List[Dict], webhook_url: str, prefix: st
             stops = order.get("stops", [])
             
             if not stops:
-                print(f"{prefix}Order {order_id} - No stops, skipping")
+                logger.debug("%sOrder %s - No stops, skipping", prefix, order_id)
                 continue
             
             first_stop = stops[0]
             
             # Check if already picked up
             if first_stop.get("actual_arrival"):
-                print(f"{prefix}Order {order_id} - Already picked up, skipping")
-                continue
-            
-            # Get scheduled pickup time
-            sched_arrive_early = first_stop.get("sched_arrive_early")
-            if not sched_arrive_early:
-                print(f"{prefix}Order {order_id} - No scheduled pickup time, skipping")
-                continue
-            
-            # Parse time and calculate hours until pickup
-            tz_abbr = first_stop.get("__timezone")
-            tz_str = TIMEZONE_MAPPING.get(tz_abbr) if tz_abbr else None
-            
-            if not tz_str:
-                print(f"{prefix}Order {order_id} - Unknown timezone '{tz_abbr}', skipping")
+                logger.debug("%sOrder %s - Already picked up, skipping", prefix, order_id)
                 continue
             
-            dt_part = sched_arrive_early.split("+")[0] if "+" in sched_arrive_early else sched_arrive_early.split("-")[0]
-            arrive_time = datetime.strptime(dt_part, "%Y%m%d%H%M%S").replace(tzinfo=ZoneInfo(tz_str))
-            
             # Get movement details and validate requirements
             movements = order.get("movement", [])
             if not movements:
-                print(f"{prefix}Order {order_id} - No movement data, skipping")
+                logger.debug("%sOrder %s - No movement data, skipping", prefix, order_id)
                 continue
             
-            # Find current movement
-            current_movement = next((m for m in movements if m.get("id") == movement_id), None)
+            # Find current movement (almost always the only/first entry)
+            current_movement = movements[0]
+            if current_movement.get("id") != movement_id:
+                current_movement = next((m for m in movements if m.get("id") == movement_id), None)
             if not current_movement:
-                print(f"{prefix}Order {order_id} - Current movement not found, skipping")
+                logger.debug("%sOrder %s - Current movement not found, skipping", prefix, order_id)
                 continue
             
             # Check brokerage status
             brokerage_status = current_movement.get("brokerage_status")
             if brokerage_status != "BOOKED":
-                print(f"{prefix}Order {order_id} - Brokerage status '{brokerage_status}' is not BOOKED, skipping")
+                logger.debug("%sOrder %s - Brokerage status '%s' is not BOOKED, skipping", prefix, order_id, brokerage_status)
                 continue
             
             # Get phone numbers
@@ -81,9 +86,28 @@ def process_pre_shipment_orders(orders: List[Dict], webhook_url: str, prefix: st
             
             # At least one phone must exist
             if not driver_phone and not dispatch_phone:
-                print(f"{prefix}Order {order_id} - Missing both phone numbers (driver: {driver_phone}, dispatch: {dispatch_phone}), skipping")
+                logger.debug(
+                    "%sOrder %s - Missing both phone numbers (driver: %s, dispatch: %s), skipping",
+                    prefix, order_id, driver_phone, dispatch_phone,
+                )
                 continue
             
+            # Get scheduled pickup time
+            sched_arrive_early = first_stop.get("sched_arrive_early")
+            if not sched_arrive_early:
+                logger.debug("%sOrder %s - No scheduled pickup time, skipping", prefix, order_id)
+                continue
+            
+            # Parse time (only for orders that passed every cheap check)
+            tz_abbr = first_stop.get("__timezone")
+            tz = TIMEZONE_MAPPING.get(tz_abbr) if tz_abbr else None
+            
+            if tz is None:
+                logger.debug("%sOrder %s - Unknown timezone '%s', skipping", prefix, order_id, tz_abbr)
+                continue
+            
+            arrive_time = parse_pickup_time(sched_arrive_early, tz)
+            
             # Get additional fields
             carrier_tractor = current_movement.get("carrier_tractor")
             carrier_trailer = current_movement.get("carrier_trailer")
@@ -92,13 +116,21 @@ def process_pre_shipment_orders(orders: List[Dict], webhook_url: str, prefix: st
             # Calculate both call times
             two_hours_before = arrive_time - timedelta(hours=2)
             thirty_minutes_before = arrive_time - timedelta(minutes=30)
-            now_local = datetime.now(ZoneInfo(tz_str))
-            seconds_until_2h = int((two_hours_before - now_local).total_seconds())
-            seconds_until_30m = int((thirty_minutes_before - now_local).total_seconds())
+            seconds_until_2h = int((two_hours_before - now_utc).total_seconds())
+            seconds_until_30m = int((thirty_minutes_before - now_utc).total_seconds())
+            send_2h = seconds_until_2h >= -late_2h_grace
+            send_30m = seconds_until_30m >= -late_30m_grace
             
-            print(f"{prefix}Order {order_id} - Sending webhooks (2h: {seconds_until_2h}s, 30m: {seconds_until_30m}s)")
+            if not send_2h and not send_30m:
+                logger.debug(
+                    "%sOrder %s - Both call times already passed (2h: %ss, 30m: %ss), skipping",
+                    prefix, order_id, seconds_until_2h, seconds_until_30m,
+                )
+                continue
+            
+            logger.info("%sOrder %s - Sending webhooks (2h: %ss, 30m: %ss)", prefix, order_id, seconds_until_2h, seconds_until_30m)
             
-            # Base payload for both calls
+            # Base payload for both calls (copied for 2h when 30m also needs it)
             base_payload = {
                 "order_id": order_id,
                 "movement_id": movement_id,
@@ -108,47 +140,55 @@ def process_pre_shipment_orders(orders: List[Dict], webhook_url: str, prefix: st
                 "carrier_tractor": carrier_tractor,
                 "carrier_trailer": carrier_trailer,
                 "scheduled_pickup_time": arrive_time.isoformat(),
-                "source": "meiborg_load_sync_pre_shipment",
-                "timestamp": datetime.utcnow().isoformat() + "Z"
+                "source": PRE_SHIPMENT_SOURCE,
+                "timestamp": run_timestamp
             }
             
-            # Send 2-hour webhook
-            payload_2h = {
-                **base_payload,
-                "call_type": "2_hour_before",
-                "seconds_until_call": seconds_until_2h,
-                "scheduled_call_time": two_hours_before.isoformat()
-            }
-            result_2h = send_webhook(webhook_url, payload_2h, f"{prefix}[2H]")
-            results.append(result_2h)
-            
-            # Send 30-minute webhook
-            payload_30m = {
-                **base_payload,
-                "call_type": "30_minute_before",
-                "seconds_until_call": seconds_until_30m,
-                "scheduled_call_time": thirty_minutes_before.isoformat()
-            }
-            result_30m = send_webhook(webhook_url, payload_30m, f"{prefix}[30M]")
-            results.append(result_30m)
+            # Queue 2-hour webhook
+            if send_2h:
+                payload_2h = base_payload.copy() if send_30m else base_payload
+                payload_2h["call_type"] = "2_hour_before"
+                payload_2h["seconds_until_call"] = seconds_until_2h
+                payload_2h["scheduled_call_time"] = two_hours_before.isoformat()
+                pending.append((len(results), payload_2h, f"{prefix}[2H]"))
+                results.append(None)
+            else:
+                logger.debug("%sOrder %s - 2h call time passed %ss ago, skipping it", prefix, order_id, -seconds_until_2h)
+            
+            # Queue 30-minute webhook
+            if send_30m:
+                payload_30m = base_payload
+                payload_30m["call_type"] = "30_minute_before"
+                payload_30m["seconds_until_call"] = seconds_until_30m
+                payload_30m["scheduled_call_time"] = thirty_minutes_before.isoformat()
+                pending.append((len(results), payload_30m, f"{prefix}[30M]"))
+                results.append(None)
             
         except Exception as e:
-            print(f"{prefix}Error processing order {order.get('id', 'unknown')}: {e}")
+            logger.error("%sError processing order %s: %s", prefix, order.get("id", "unknown"), e)
             results.append({"order_id": order.get("id", "unknown"), "error": str(e), "success": False})
     
+    # Send queued webhooks concurrently (I/O bound)
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(WEBHOOK_MAX_WORKERS, len(pending))) as pool:
+            sent = pool.map(lambda item: send_webhook(webhook_url, item[1], item[2]), pending)
+            for (idx, _, _), result in zip(pending, sent):
+                results[idx] = result
+    
     return results
 
 
 def pre_shipment_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handler for pre-shipment load sync (~2 hours before pickup)."""
     try:
-        print("Running Meiborg Brothers pre-shipment load sync (2 hours before pickup)")
+        logger.info("Running Meiborg Brothers pre-shipment load sync (2 hours before pickup)")
         
         # Get config (using Railway naming convention)
-        base_url = os.getenv("MCLEOD_BASE_URL")
-        auth_token = os.getenv("MCLEOD_AUTH_TOKEN")
-        token_type = os.getenv("MCLEOD_AUTH_TYPE", "Bearer")
-        webhook_url = os.getenv("PRE_SHIPMENT_WEBHOOK_URL")  # HappyRobot pre-shipment workflow hook
+        config = get_config()
+        base_url = config.mcleod_base_url
+        auth_token = config.mcleod_auth_token
+        token_type = config.mcleod_auth_type
+        webhook_url = config.pre_shipment_webhook_url  # HappyRobot pre-shipment workflow hook
         
         if not base_url or not auth_token:
             return {"statusCode": 400, "body": json.dumps({"error": "MCLEOD_BASE_URL and MCLEOD_AUTH_TOKEN required"})}
@@ -172,7 +212,7 @@ def pre_shipment_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         start_param = format_time_param(start_time, now.date())
         end_param = format_time_param(end_time, now.date())
         
-        print(f"Searching for orders scheduled {start_param} to {end_param}")
+        logger.info("Searching for orders scheduled %s to %s", start_param, end_param)
         
         # Process production
         results = []
@@ -183,35 +223,35 @@ def pre_shipment_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             try:
                 resp = fetch_orders(base_url, auth_token, token_type, start_param, end_param)
                 if resp.status_code == 200:
-                    orders = normalize_response_to_list(resp.json())
-                    print(f"Found {len(orders)} orders")
+                    orders = orders_from_response(resp)
+                    logger.info("Found %d orders", len(orders))
                     results = process_pre_shipment_orders(orders, webhook_url)
                 else:
-                    print(f"API request failed with status {resp.status_code}: {resp.text}")
+                    logger.error("API request failed with status %s: %s", resp.status_code, resp.text)
                     production_error = f"API returned status {resp.status_code}"
             except Exception as e:
-                print(f"Error fetching production orders: {e}")
+                logger.error("Error fetching production orders: %s", e)
                 production_error = str(e)
         
         # Process TRN (staging environment)
         trn_results = []
         trn_orders = []
         trn_error = None
-        trn_base_url = os.getenv("TRN_MCLEOD_BASE_URL")
-        trn_webhook_url = os.getenv("TRN_PRE_SHIPMENT_WEBHOOK_URL")
+        trn_base_url = config.trn_mcleod_base_url
+        trn_webhook_url = config.trn_pre_shipment_webhook_url
         
         if trn_base_url and trn_webhook_url:
             try:
-                trn_resp = fetch_orders(trn_base_url, os.getenv("TRN_MCLEOD_AUTH_TOKEN"), os.getenv("TRN_MCLEOD_AUTH_TYPE", "Bearer"), start_param, end_param, "TRN - ")
+                trn_resp = fetch_orders(trn_base_url, config.trn_mcleod_auth_token, config.trn_mcleod_auth_type, start_param, end_param, "TRN - ")
                 if trn_resp.status_code == 200:
-                    trn_orders = normalize_response_to_list(trn_resp.json())
-                    print(f"TRN - Found {len(trn_orders)} orders")
+                    trn_orders = orders_from_response(trn_resp)
+                    logger.info("TRN - Found %d orders", len(trn_orders))
                     trn_results = process_pre_shipment_orders(trn_orders, trn_webhook_url, "TRN - ")
                 else:
-                    print(f"TRN - API request failed with status {trn_resp.status_code}: {trn_resp.text}")
+                    logger.error("TRN - API request failed with status %s: %s", trn_resp.status_code, trn_resp.text)
                     trn_error = f"API returned status {trn_resp.status_code}"
             except Exception as e:
-                print(f"TRN - Error fetching orders: {e}")
+                logger.error("TRN - Error fetching orders: %s", e)
                 trn_error = str(e)
         
         response_body = {
@@ -235,7 +275,5 @@ def pre_shipment_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
     
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error: %s", e)
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
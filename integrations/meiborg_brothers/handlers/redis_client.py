@@ -1,22 +1,40 @@
 """Redis client for deduplication tracking."""
 
-import os
 import json
-from typing import Optional, Dict, Any
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterable, Set
 import redis
 
+from handlers.config import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+# Process-wide client; redis-py pools connections, so one instance serves every call
+_client: Optional[redis.Redis] = None
+
 
 def get_redis_client() -> Optional[redis.Redis]:
     """
     Get Redis client from REDIS_URL environment variable.
 
+    The first successful connection is reused for the life of the process;
+    failed connection attempts are retried on the next call.
+
     Returns:
         Redis client if REDIS_URL is set, None otherwise
     """
-    redis_url = os.getenv("REDIS_URL")
+    global _client
+
+    if _client is not None:
+        return _client
+
+    redis_url = get_config().redis_url
 
     if not redis_url:
-        print("WARNING: REDIS_URL not set - deduplication disabled")
+        logger.warning("REDIS_URL not set - deduplication disabled")
         return None
 
     try:
@@ -28,12 +46,25 @@ def get_redis_client() -> Optional[redis.Redis]:
         )
         # Test connection
         client.ping()
+        _client = client
         return client
     except Exception as e:
-        print(f"ERROR: Failed to connect to Redis: {e}")
+        logger.error("Failed to connect to Redis: %s", e)
         return None
 
 
+def close_redis() -> None:
+    """Close the cached Redis client (if any) so the next call reconnects."""
+    global _client
+
+    client, _client = _client, None
+    if client is not None:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning("Failed to close Redis client: %s", e)
+
+
 def has_been_called(order_id: str) -> bool:
     """
     Check if an order has already been called for pre-pickup.
@@ -55,11 +86,40 @@ def has_been_called(order_id: str) -> bool:
         exists = client.exists(key)
         return bool(exists)
     except Exception as e:
-        print(f"ERROR: Redis check failed for order {order_id}: {e}")
+        logger.error("Redis check failed for order %s: %s", order_id, e)
         # Fail open - allow the call if Redis errors
         return False
 
 
+def has_been_called_bulk(order_ids: Iterable[str]) -> Set[str]:
+    """
+    Check which orders have already been called for pre-pickup, in one MGET.
+
+    Args:
+        order_ids: The order IDs to check
+
+    Returns:
+        Set of order IDs that were already called (empty if Redis is unavailable)
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return set()
+
+    client = get_redis_client()
+
+    if not client:
+        # If Redis is not available, allow the calls (fail open)
+        return set()
+
+    try:
+        values = client.mget([f"prepickup:{order_id}" for order_id in order_ids])
+        return {order_id for order_id, value in zip(order_ids, values) if value is not None}
+    except Exception as e:
+        logger.error("Redis bulk check failed for %d orders: %s", len(order_ids), e)
+        # Fail open - allow the calls if Redis errors
+        return set()
+
+
 def mark_as_called(order_id: str, pickup_time: str, additional_data: Optional[Dict[str, Any]] = None) -> bool:
     """
     Mark an order as called in Redis with 7-day TTL.
@@ -75,7 +135,7 @@ def mark_as_called(order_id: str, pickup_time: str, additional_data: Optional[Di
     client = get_redis_client()
 
     if not client:
-        print(f"WARNING: Redis not available - cannot mark order {order_id} as called")
+        logger.warning("Redis not available - cannot mark order %s as called", order_id)
         return False
 
     try:
@@ -83,7 +143,7 @@ def mark_as_called(order_id: str, pickup_time: str, additional_data: Optional[Di
 
         # Build data to store
         data = {
-            "called_at": __import__("datetime").datetime.utcnow().isoformat() + "Z",
+            "called_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
             "pickup_time": pickup_time
         }
 
@@ -97,14 +157,71 @@ def mark_as_called(order_id: str, pickup_time: str, additional_data: Optional[Di
             json.dumps(data)
         )
 
-        print(f"Marked order {order_id} as called in Redis (TTL: 7 days)")
+        logger.info("Marked order %s as called in Redis (TTL: 7 days)", order_id)
         return True
 
     except Exception as e:
-        print(f"ERROR: Failed to mark order {order_id} as called: {e}")
+        logger.error("Failed to mark order %s as called: %s", order_id, e)
         return False
 
 
+def claim_call(order_id: str, pickup_time: str) -> bool:
+    """
+    Atomically mark an order as called (SET NX, 7-day TTL) before its webhook is sent.
+
+    The mark is visible to overlapping runs as soon as it is written, so only
+    one of them can call the order; release_call drops it if the call fails.
+
+    Args:
+        order_id: The order ID
+        pickup_time: ISO format pickup time
+
+    Returns:
+        True if this caller owns the call (also when Redis is unavailable),
+        False if the order was already marked as called
+    """
+    client = get_redis_client()
+
+    if not client:
+        # If Redis is not available, allow the call (fail open)
+        logger.warning("Redis not available - cannot mark order %s as called", order_id)
+        return True
+
+    try:
+        data = {
+            "called_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "pickup_time": pickup_time
+        }
+        # Store with 7-day TTL (604800 seconds), only if not already marked
+        claimed = client.set(f"prepickup:{order_id}", json.dumps(data), ex=604800, nx=True)
+        if claimed:
+            logger.info("Marked order %s as called in Redis (TTL: 7 days)", order_id)
+        return bool(claimed)
+
+    except Exception as e:
+        logger.error("Failed to mark order %s as called: %s", order_id, e)
+        # Fail open - allow the call if Redis errors
+        return True
+
+
+def release_call(order_id: str) -> None:
+    """
+    Drop the mark written by claim_call, so a failed call is retried next run.
+
+    Args:
+        order_id: The order ID
+    """
+    client = get_redis_client()
+
+    if not client:
+        return
+
+    try:
+        client.delete(f"prepickup:{order_id}")
+    except Exception as e:
+        logger.error("Failed to release call mark for order %s: %s", order_id, e)
+
+
 def get_call_data(order_id: str) -> Optional[Dict[str, Any]]:
     """
     Get stored call data for an order.
@@ -129,5 +246,5 @@ def get_call_data(order_id: str) -> Optional[Dict[str, Any]]:
         return None
 
     except Exception as e:
-        print(f"ERROR: Failed to get call data for order {order_id}: {e}")
+        logger.error("Failed to get call data for order %s: %s", order_id, e)
         return None
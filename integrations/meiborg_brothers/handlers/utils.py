@@ -1,9 +1,45 @@
 """Shared utilities for load sync handlers."""
 
-import os
+import logging
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, tzinfo
 from typing import Dict, Any
 
+from handlers.config import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bound on concurrent webhook requests per cron run
+WEBHOOK_MAX_WORKERS = 16
+
+# Shared HTTP session so McLeod and webhook calls reuse keep-alive connections;
+# the pool is sized for WEBHOOK_MAX_WORKERS concurrent requests per host.
+# Only GETs are retried, and only on a gateway error status: connect and read
+# errors are never retried, so a webhook POST is sent at most once and a
+# stuck McLeod read does not repeat its 90s timeout. Once retries run out the
+# last response is returned as-is.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=2,
+        connect=0,
+        read=0,
+        other=0,
+        status=2,
+        allowed_methods=frozenset({"GET"}),
+        status_forcelist=(502, 503, 504),
+        backoff_factor=0.3,
+        raise_on_status=False,
+    ),
+))
+
 
 def fetch_orders(
     base_url: str,
@@ -16,7 +52,7 @@ def fetch_orders(
     """Fetch orders from McLeod API with given time parameters."""
     endpoint = f"/ws/orders/search?shipper.sched_arrive_early=>={start_param}&shipper.sched_arrive_early=<{end_param}"
 
-    print(f"{prefix}Endpoint: {endpoint}")
+    logger.info("%sEndpoint: %s", prefix, endpoint)
 
     headers = {"Accept": "application/json"}
     if token_type and token_type.lower() != "none":
@@ -25,34 +61,70 @@ def fetch_orders(
         headers["Authorization"] = auth_token
 
     # Add company ID header if configured
-    company_id = os.environ.get("MCLEOD_COMPANY_ID")
+    company_id = get_config().mcleod_company_id
     if company_id:
         headers["X-com.mcleodsoftware.CompanyID"] = company_id
 
-    return requests.get(
+    return SESSION.get(
         f"{base_url}{endpoint}",
         headers=headers,
         timeout=90,
     )
 
 
+def parse_mcleod_datetime(value: str, tz: tzinfo) -> datetime:
+    """Parse a McLeod YYYYMMDDHHMMSS[+/-HHMM] timestamp as wall-clock time in tz.
+
+    The offset suffix is ignored; the stop's own timezone is authoritative.
+    """
+    if len(value) < 14 or not value[:14].isdigit() or (len(value) > 14 and value[14] not in "+-"):
+        raise ValueError(f"Invalid McLeod timestamp: {value!r}")
+    return datetime(
+        int(value[0:4]), int(value[4:6]), int(value[6:8]),
+        int(value[8:10]), int(value[10:12]), int(value[12:14]),
+        tzinfo=tz,
+    )
+
+
+def parse_pickup_time(value: str, tz: tzinfo) -> datetime:
+    """
+    Parse a stop's sched_arrive_early in the stop's timezone.
+
+    Handles McLeod's YYYYMMDDHHMMSS[+/-HHMM] (fixed-width slicing, then a
+    lenient strptime fallback) and ISO-8601 values (C-level fromisoformat).
+    An ISO value's own offset is honored; a naive one is taken as wall-clock
+    time in tz.
+    """
+    if len(value) >= 10 and value[4] == "-" and value[7] == "-":
+        parsed = datetime.fromisoformat(value)
+        return parsed.replace(tzinfo=tz) if parsed.tzinfo is None else parsed.astimezone(tz)
+    try:
+        return parse_mcleod_datetime(value, tz)
+    except ValueError:
+        # Not the fixed-width layout; keep strptime's more lenient parse
+        dt_part = value.split("+")[0] if "+" in value else value.split("-")[0]
+        return datetime.strptime(dt_part, "%Y%m%d%H%M%S").replace(tzinfo=tz)
+
+
 def normalize_response_to_list(response_data: Any) -> list:
     """Normalize API response to a list of orders."""
     if isinstance(response_data, dict):
-        if response_data.get("__type") == "orders":
-            return [response_data]
-        else:
-            return [response_data]
+        return [response_data]
     elif isinstance(response_data, list):
         return response_data
     else:
         return []
 
 
+def orders_from_response(resp: requests.Response) -> list:
+    """Decode a McLeod orders response (orjson, straight from the body bytes) into a list of orders."""
+    return normalize_response_to_list(orjson.loads(resp.content))
+
+
 def send_webhook(webhook_url: str, payload: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
     """Send webhook and return result."""
     try:
-        webhook_resp = requests.post(
+        webhook_resp = SESSION.post(
             webhook_url,
             json=payload,
             headers={"Content-Type": "application/json"},
@@ -62,23 +134,23 @@ def send_webhook(webhook_url: str, payload: Dict[str, Any], prefix: str = "") ->
         result = {
             "order_id": payload.get("order_id"),
             "webhook_status": webhook_resp.status_code,
-            "success": webhook_resp.status_code in (200, 201, 202)
+            "success": 200 <= webhook_resp.status_code < 300
         }
         
         if result["success"]:
-            print(f"{prefix}Successfully sent webhook for order {payload.get('order_id')}")
+            logger.info("%sSuccessfully sent webhook for order %s", prefix, payload.get("order_id"))
             try:
                 result["response"] = webhook_resp.json()
             except:
                 result["response"] = webhook_resp.text
         else:
-            print(f"{prefix}Failed webhook for order {payload.get('order_id')}: {webhook_resp.text}")
+            logger.error("%sFailed webhook for order %s: %s", prefix, payload.get("order_id"), webhook_resp.text)
             result["error"] = webhook_resp.text
         
         return result
     
     except Exception as e:
-        print(f"{prefix}Error sending webhook: {e}")
+        logger.error("%sError sending webhook: %s", prefix, e)
         return {
             "order_id": payload.get("order_id"),
             "error": str(e),
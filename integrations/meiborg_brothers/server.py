@@ -6,22 +6,75 @@ Combines:
 - In-Transit Handler (cron: morning/afternoon check-ins)
 """
 
+import asyncio
+import logging
 import os
-import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
-from handlers.find_load import lambda_handler as find_load_handler
+# Load environment variables before importing handlers, which read their
+# configuration at import time
+load_dotenv()
+
+# Handlers log through the logging module; send it to stdout. Per-order skip
+# messages are DEBUG (set LOG_LEVEL=DEBUG to see them).
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(levelname)s %(name)s: %(message)s",
+    stream=sys.stdout,
+)
+logger = logging.getLogger(__name__)
+
+from handlers.find_load import find_load_handler
 from handlers.pre_shipment import pre_shipment_handler
 from handlers.in_transit import in_transit_handler
 from handlers.pre_pickup import pre_pickup_handler
 from handlers.find_load_utils import map_find_load_payload, safe_get
 
-# Load environment variables
-load_dotenv()
+app = FastAPI(
+    title="Meiborg Brothers Integrations",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
-app = FastAPI(title="Meiborg Brothers Integrations", version="1.0.0")
+# Cron handlers are synchronous and run for minutes; they get their own small
+# pool so they neither block the event loop nor starve the default executor.
+_CRON_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cron")
+
+# One lock per cron handler: an overlapping trigger (or cron retry) of a job
+# that is still running is skipped, so the Redis dedup never races itself.
+_CRON_LOCKS = {
+    handler: threading.Lock()
+    for handler in (pre_shipment_handler, in_transit_handler, pre_pickup_handler)
+}
+
+
+def _run_exclusive(handler):
+    """Run handler unless a previous run of it is still in progress."""
+    lock = _CRON_LOCKS[handler]
+    if not lock.acquire(blocking=False):
+        logger.warning("%s is already running - skipping this trigger", handler.__name__)
+        return {
+            "statusCode": 409,
+            "body": {"message": f"{handler.__name__} is already running, skipped"},
+        }
+    try:
+        return handler({}, None)
+    finally:
+        lock.release()
+
+
+async def _run_cron_handler(handler):
+    """Run a Lambda-style cron handler off the event loop, one run at a time."""
+    loop = asyncio.get_running_loop()
+    # The lock is taken in the worker, so a dropped request can't release it
+    # while the handler is still running
+    return await loop.run_in_executor(_CRON_EXECUTOR, _run_exclusive, handler)
 
 
 @app.get("/find-load")
@@ -44,15 +97,11 @@ async def find_load(request: Request, order_id: str = None):
         
         # Call find_load handler
         result = find_load_handler({"body": body}, None)
-        
-        # Parse body if it's a JSON string
         body_content = result.get("body")
-        if isinstance(body_content, str):
-            body_content = json.loads(body_content)
         
         # Handle handler-level errors
         if result.get("statusCode") != 200:
-            return JSONResponse(status_code=result.get("statusCode", 500), content=body_content)
+            return ORJSONResponse(status_code=result.get("statusCode", 500), content=body_content)
         
         # Extract data and proxy from handler response
         data = body_content.get("data")
@@ -91,10 +140,10 @@ async def find_load(request: Request, order_id: str = None):
         payload.pop("posted_carrier_rate", None)
         payload.pop("max_buy", None)
         
-        return JSONResponse(status_code=200, content=payload)
+        return ORJSONResponse(status_code=200, content=payload)
     
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "statusCode": 500,
@@ -115,17 +164,17 @@ async def find_load_before_negotiation(request: Request):
                 body["record_offset"] = int(body["record_offset"])
 
         event = {
-            "body": json.dumps(body) if isinstance(body, dict) else body,
+            "body": body,
             "headers": dict(request.headers),
             "httpMethod": request.method,
             "path": str(request.url.path),
         }
 
         result = find_load_handler(event, None)
-        response_body = json.loads(result["body"]) if "body" in result else result
+        response_body = result["body"] if "body" in result else result
 
         if result.get("statusCode") != 200:
-            return JSONResponse(status_code=result.get("statusCode", 500), content=response_body)
+            return ORJSONResponse(status_code=result.get("statusCode", 500), content=response_body)
 
         data = response_body.get("data")
         proxy = response_body.get("proxy") if isinstance(response_body, dict) else None
@@ -152,14 +201,11 @@ async def find_load_before_negotiation(request: Request):
             payload["broker_load_id"] = broker_id
         # Include broker raw response for debugging when asked
         if proxy and isinstance(proxy, dict) and "response" in proxy:
-            try:
-                print("[broker] response:", proxy["response"])  # server log
-            except Exception:
-                pass
+            logger.info("[broker] response: %s", proxy["response"])
             payload["broker_response"] = proxy["response"]
-        return JSONResponse(status_code=200, content=payload)
+        return ORJSONResponse(status_code=200, content=payload)
     except Exception as e:
-        return JSONResponse(status_code=500, content={"status_code": 500, "message": f"Internal server error: {str(e)}"})
+        return ORJSONResponse(status_code=500, content={"status_code": 500, "message": f"Internal server error: {str(e)}"})
 
 @app.post("/sync-pre-shipment")
 @app.get("/sync-pre-shipment")
@@ -170,21 +216,20 @@ async def sync_pre_shipment():
     """
     try:
         # Call pre-shipment handler
-        result = pre_shipment_handler({}, None)
+        result = await _run_cron_handler(pre_shipment_handler)
         
         # Parse body if it's a JSON string (error case)
         body_content = result.get("body", {})
         if isinstance(body_content, str):
-            import json
-            body_content = json.loads(body_content)
+            body_content = orjson.loads(body_content)
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=result.get("statusCode", 200),
             content=body_content
         )
     
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "statusCode": 500,
@@ -202,21 +247,20 @@ async def sync_in_transit():
     """
     try:
         # Call in-transit handler
-        result = in_transit_handler({}, None)
+        result = await _run_cron_handler(in_transit_handler)
         
         # Parse body if it's a JSON string (error case)
         body_content = result.get("body", {})
         if isinstance(body_content, str):
-            import json
-            body_content = json.loads(body_content)
+            body_content = orjson.loads(body_content)
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=result.get("statusCode", 200),
             content=body_content
         )
     
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "statusCode": 500,
@@ -234,20 +278,20 @@ async def sync_pre_pickup():
     """
     try:
         # Call pre-pickup handler
-        result = pre_pickup_handler({}, None)
+        result = await _run_cron_handler(pre_pickup_handler)
 
         # Parse body if it's a JSON string (error case)
         body_content = result.get("body", {})
         if isinstance(body_content, str):
-            body_content = json.loads(body_content)
+            body_content = orjson.loads(body_content)
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=result.get("statusCode", 200),
             content=body_content
         )
 
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "statusCode": 500,